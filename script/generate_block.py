@@ -1,16 +1,44 @@
 #!/usr/bin/env python3
 
 import argparse
+import collections
+import concurrent.futures
 import json
 import os
 import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
+import requests
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from web3 import Web3
 
+# orjson encodes and decodes the multi-megabyte block payloads several times
+# faster than the standard library; fall back to json when it is missing
+try:
+    import orjson
+
+    def json_dumps(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj, pretty: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if pretty else None).encode()
+
+    json_loads = json.loads
+
+# zstandard is optional; without it the output is written as plain JSON
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
 # Operation code mapping
 OPERATION_CODES = {
     "keccak": "0x0003",
@@ -19,6 +47,41 @@ OPERATION_CODES = {
     "ecrecover": "0x0021",
 }
 
+# Calldata prefix for each attack type: the f(uint256,uint256,uint256)
+# selector followed by the ABI-encoded operation code
+ATTACK_SELECTOR = function_signature_to_4byte_selector("f(uint256,uint256,uint256)")
+ATTACK_CALLDATA_PREFIXES = {
+    attack_type: ATTACK_SELECTOR + encode(["uint256"], [int(op_code, 16)])
+    for attack_type, op_code in OPERATION_CODES.items()
+}
+
+# Maximum number of calls packed into a single JSON-RPC batch request
+RPC_BATCH_SIZE = 20
+
+# Number of concurrent fetch-and-serialize workers
+RPC_FETCH_WORKERS = 16
+
+# Connection pool size of the HTTP session shared by every RPC call
+RPC_POOL_SIZE = 32
+
+# Gas limit for deploying the ZKarnage contract
+DEPLOY_GAS_LIMIT = 3_000_000
+
+# Prefix of the creation bytecode field in a compact Foundry artifact
+ARTIFACT_BYTECODE_MARKER = b'"bytecode":{"object":"'
+
+# Header fields kept for the blocks before the attack block in lazy mode
+MANIFEST_FIELDS = ("number", "hash", "parentHash")
+
+# Seconds to wait for Anvil to start answering RPC requests
+ANVIL_STARTUP_TIMEOUT = 10
+
+# Seconds a single Anvil readiness probe may take before the next poll
+ANVIL_PROBE_TIMEOUT = 1
+
+# Number of progress lines printed while fetching or saving a block range
+PROGRESS_UPDATES = 10
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate a prover killer block using ZKarnage")
     parser.add_argument(
@@ -74,6 +137,23 @@ def parse_args():
         default="src/ZKarnage.yul",
         help="Path to the Yul contract (default: src/ZKarnage.yul)",
     )
+    parser.add_argument(
+        "--blocks-mode",
+        choices=["attack-only", "range", "lazy"],
+        default="attack-only",
+        help="Blocks to save: only the attack block, every block since the fork, "
+             "or the attack block plus a number/hash/parentHash manifest of the blocks before it (default: attack-only)",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the output JSON for readability (slower on large block ranges)",
+    )
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="Write plain JSON instead of zstd-compressed .json.zst",
+    )
     args = parser.parse_args()
     
     # Set default output file if not provided
@@ -87,10 +167,28 @@ def parse_args():
         
         # Generate a descriptive filename
         args.output_file = f"{blocks_dir}/block_{args.attack_type}_{args.gas_limit}_{args.gas_threshold}_fork_{args.fork_block}.json"
-        print(f"Output will be saved to: {args.output_file}")
+    
+    # Compressed output gets a .zst suffix
+    args.compress = not args.no_compress
+    if args.compress and zstd is None:
+        print("Warning: zstandard is not installed, writing uncompressed JSON")
+        args.compress = False
+    if args.compress and not args.output_file.endswith(".zst"):
+        args.output_file += ".zst"
+    print(f"Output will be saved to: {args.output_file}")
     
     return args
 
+def open_output(output_path: Path, compress: bool, mode: str):
+    """Open the output file for binary reading or writing, through zstd when compressed"""
+    f = open(output_path, mode + "b")
+    if not compress:
+        return f
+    if mode == "w":
+        # Multi-threaded compression keeps up with large block ranges
+        return zstd.ZstdCompressor(level=3, threads=-1).stream_writer(f)
+    return zstd.ZstdDecompressor().stream_reader(f)
+
 def start_anvil(rpc_url: str, fork_block: int, port: int) -> subprocess.Popen:
     """Start anvil process forking from the specified block and forward its output"""
     cmd = [
@@ -103,52 +201,119 @@ def start_anvil(rpc_url: str, fork_block: int, port: int) -> subprocess.Popen:
     ]
     
     print("Starting Anvil...")
-    # Start Anvil without redirecting stdout/stderr so logs show in console
+    # Anvil inherits our stdout so its logs reach the console without a
+    # Python thread copying them line by line
     process = subprocess.Popen(
         cmd,
-        stdout=subprocess.PIPE, 
+        stdout=sys.stdout,
         stderr=subprocess.STDOUT,  # Redirect stderr to stdout
-        text=True,
-        bufsize=1,  # Line buffered
-        universal_newlines=True
     )
     
-    # Start a thread to read and print Anvil's output
-    def print_output(process):
-        for line in iter(process.stdout.readline, ''):
-            print(f"Anvil: {line.rstrip()}")
+    # Wait for anvil to start serving the forked chain; probe without the shared
+    # session, whose retrying adapter would stretch each refused poll to ~0.6s
+    local_rpc_url = f"http://localhost:{port}"
+    probe = {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}
+    start_time = time.monotonic()
+    while time.monotonic() - start_time < ANVIL_STARTUP_TIMEOUT:
+        try:
+            response = requests.post(local_rpc_url, json=probe, timeout=ANVIL_PROBE_TIMEOUT).json()
+            if int(response["result"], 16) >= fork_block:
+                return process
+        except Exception:
+            pass
+        if process.poll() is not None:
+            print(f"Anvil exited during startup with code {process.returncode}")
+            sys.exit(1)
+        time.sleep(0.05)
     
-    import threading
-    anvil_thread = threading.Thread(target=print_output, args=(process,), daemon=True)
-    anvil_thread.start()
+    print(f"Anvil did not become ready within {ANVIL_STARTUP_TIMEOUT} seconds")
+    process.terminate()
+    process.wait(timeout=5)
+    sys.exit(1)
+
+def send_transaction(w3: Web3, private_key: str, tx: Dict) -> Dict:
+    """Sign a transaction locally, send it and wait for its receipt"""
+    account = w3.eth.account.from_key(private_key)
+    tx = {
+        "from": account.address,
+        "nonce": w3.eth.get_transaction_count(account.address),
+        "gasPrice": w3.eth.gas_price,
+        "chainId": w3.eth.chain_id,
+        **tx,
+    }
+    signed_tx = account.sign_transaction(tx)
+    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+    return w3.eth.wait_for_transaction_receipt(tx_hash)
+
+def read_artifact_bytecode(artifact_path: Path) -> str:
+    """Read the creation bytecode from a Foundry build artifact"""
+    with open(artifact_path, "rb") as f:
+        data = f.read()
+    
+    # Locate bytecode.object directly instead of parsing the ABI, AST and
+    # metadata that make up most of the artifact
+    idx = data.find(ARTIFACT_BYTECODE_MARKER)
+    if idx != -1:
+        start = idx + len(ARTIFACT_BYTECODE_MARKER)
+        end = data.find(b'"', start)
+        hex_data = data[start:end].decode()
+        if hex_data.startswith("0x"):
+            hex_data = hex_data[2:]
+        try:
+            if hex_data and len(hex_data) % 2 == 0:
+                bytes.fromhex(hex_data)
+                return "0x" + hex_data
+        except ValueError:
+            pass
     
-    # Wait for anvil to start
-    time.sleep(3)
-    return process
+    # Fall back to a full parse if the layout is not what we expect
+    bytecode = json_loads(data)["bytecode"]["object"]
+    if not bytecode.startswith("0x"):
+        bytecode = "0x" + bytecode
+    return bytecode
 
-def deploy_contract(contract_path: str, rpc_url: str, private_key: str) -> str:
-    """Deploy the ZKarnage.yul contract using forge and cast send --create"""
-    print(f"Deploying contract from {contract_path}...")
+def contract_artifact_path(contract_path: str) -> Path:
+    """Return the Foundry build artifact path for the contract source"""
+    # Get the contract name from the path
+    contract_name = "ZKarnage" # Hardcoded based on user edit
+    return Path("out") / f"{Path(contract_path).name}" / f"{contract_name}.json"
+
+def start_contract_build(contract_path: str) -> Optional[subprocess.Popen]:
+    """Start forge build in the background so it overlaps Anvil startup"""
+    artifact_path = contract_artifact_path(contract_path)
+    
+    # Compile the contract, unless the artifact is newer than the source
+    # (or ZKARNAGE_NO_BUILD=1 asks to reuse whatever is already built)
+    artifact_mtime = os.path.getmtime(artifact_path) if artifact_path.exists() else 0
+    if os.environ.get("ZKARNAGE_NO_BUILD") == "1":
+        print("Skipping compilation (ZKARNAGE_NO_BUILD=1)")
+        return None
+    if not os.path.exists(contract_path):
+        print(f"Error: Contract source not found at {contract_path}")
+        sys.exit(1)
+    if artifact_mtime > os.path.getmtime(contract_path):
+        print(f"Build artifact {artifact_path} is up to date, skipping compilation")
+        return None
     
-    # Compile the contract
+    print(f"Compiling {contract_path} in the background...")
     compile_cmd = ["forge", "build", "--root", "."]
-    result = subprocess.run(compile_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error compiling contract: {result.stderr}")
-        sys.exit(1)
+    return subprocess.Popen(compile_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+def deploy_contract(w3: Web3, contract_path: str, private_key: str, build_process: Optional[subprocess.Popen] = None) -> str:
+    """Deploy the ZKarnage.yul contract using forge and a locally signed transaction"""
+    print(f"Deploying contract from {contract_path}...")
+    artifact_path = contract_artifact_path(contract_path)
     
-    # Get the contract name from the path
-    contract_name = "ZKarnage" # Hardcoded based on user edit
-    # Construct the path to the build artifact
-    artifact_path = Path("out") / f"{Path(contract_path).name}" / f"{contract_name}.json"
+    # Wait for the background compilation started by start_contract_build
+    if build_process is not None:
+        _, stderr = build_process.communicate()
+        if build_process.returncode != 0:
+            print(f"Error compiling contract: {stderr}")
+            sys.exit(1)
 
     # Read the bytecode from the artifact
     try:
-        with open(artifact_path, "r") as f:
-            artifact = json.load(f)
-            bytecode = artifact["bytecode"]["object"]
-            if not bytecode.startswith("0x"):
-                bytecode = "0x" + bytecode
+        bytecode = read_artifact_bytecode(artifact_path)
     except FileNotFoundError:
         print(f"Error: Build artifact not found at {artifact_path}")
         sys.exit(1)
@@ -158,244 +323,221 @@ def deploy_contract(contract_path: str, rpc_url: str, private_key: str) -> str:
 
     print(f"Bytecode length: {len(bytecode)//2 -1}")
     
-    # Deploy the contract using cast send --create
-    deploy_cmd = [
-        "cast", "send",
-        "--rpc-url", rpc_url,
-        "--private-key", private_key,
-        "--create", bytecode,
-    ]
-    
-    result = subprocess.run(deploy_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    # Deploy the contract with a locally signed creation transaction
+    try:
+        receipt = send_transaction(w3, private_key, {"data": bytecode, "gas": DEPLOY_GAS_LIMIT})
+    except Exception as e:
         # Check if the error is due to insufficient funds
-        if "insufficient funds" in result.stderr.lower():
-             print(f"Deployment failed: Insufficient funds for account associated with private key.")
+        if "insufficient funds" in str(e).lower():
+            print(f"Deployment failed: Insufficient funds for account associated with private key.")
         else:
-            print(f"Error deploying contract with cast send --create: {result.stderr}")
+            print(f"Error deploying contract: {e}")
         sys.exit(1)
     
-    # Extract deployed address from output
-    output = result.stdout
-    # Look for contractAddress in the output JSON (less likely for cast send)
-    try:
-        receipt_json = json.loads(output)
-        address = receipt_json.get("contractAddress")
-        if address:
-             print(f"Contract deployed at: {address}")
-             return address
-        else:
-            print(f"Could not find 'contractAddress' in cast send output JSON: {output}")
-            # Don't exit here, try text parsing next
-    except json.JSONDecodeError:
-        pass # Expected if output is not JSON, try text parsing
-
-    # Fallback: Parse text output for contract address
-    for line in output.split("\n"):
-        line_stripped = line.strip()
-        # Look for lines starting with 'contractAddress' followed by whitespace
-        if line_stripped.lower().startswith("contractaddress"):
-            parts = line_stripped.split()
-            if len(parts) >= 2:
-                potential_address = parts[-1]
-                if potential_address.startswith("0x") and len(potential_address) == 42:
-                    print(f"Contract deployed at: {potential_address}")
-                    return potential_address
-        # Check for older formats just in case
-        elif "contractAddress:" in line:
-             address = line.split("contractAddress:")[1].strip()
-             if address.startswith("0x") and len(address) == 42:
-                 print(f"Contract deployed at: {address}")
-                 return address
-
-                    
-    print(f"Could not find deployed contract address in cast send --create output: {output}")
-    sys.exit(1)
+    address = receipt.contractAddress
+    if not address:
+        print(f"Could not find deployed contract address in receipt: {receipt}")
+        sys.exit(1)
+    
+    print(f"Contract deployed at: {address}")
+    return address
 
 def execute_attack_tx(
+    w3: Web3,
     contract_address: str,
     attack_type: str, 
     gas_limit: int,
     gas_threshold: int,
-    rpc_url: str,
     private_key: str,
-) -> str:
-    """Execute the attack transaction and return the transaction hash"""
+) -> Tuple[str, Optional[int]]:
+    """Execute the attack transaction and return the transaction hash and, if known, its block number"""
     print(f"Executing {attack_type} attack...")
     
-    # Get operation code from mapping
-    op_code = OPERATION_CODES[attack_type]
-    
-    # First, calculate the function selector for f(uint256,uint256,uint256)
-    print("Calculating function selector...")
-    function_hash_cmd = ["cast", "sig", "f(uint256,uint256,uint256)"]
-    print(f"Running: {' '.join(function_hash_cmd)}")
-    result = subprocess.run(function_hash_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error calculating function selector: {result.stderr}")
-        sys.exit(1)
-    
-    # The output of 'cast sig' is already the full selector with 0x prefix
-    function_selector = result.stdout.strip()
-    print(f"Function selector: {function_selector}")
-    
-    # Now encode the parameters using abi-encode
-    print("Encoding parameters...")
-    param_cmd = [
-        "cast", "abi-encode", 
-        "f(uint256,uint256,uint256)", 
-        op_code, 
-        str(gas_threshold), 
-        "0x0000000000000000000000000000000000000000"
-    ]
-    print(f"Running: {' '.join(param_cmd)}")
-    result = subprocess.run(param_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error generating transaction data: {result.stderr}")
-        sys.exit(1)
-    
-    param_data = result.stdout.strip()
-    print(f"Raw encoded parameters: {param_data}")
-    
-    # Extract just the parameter data (removing function selector if present)
-    if param_data.startswith("0x"):
-        # Check if it already includes a function selector (first 10 chars including 0x)
-        if len(param_data) >= 10:
-            encoded_params = param_data[10:]  # Skip "0x" + 8 chars of selector
-        else:
-            encoded_params = param_data[2:]   # Just skip "0x"
-    else:
-        encoded_params = param_data
-        
-    # Create transaction data by combining selector and parameters
-    tx_data = function_selector + encoded_params
-    print(f"Final transaction data: {tx_data}")
-    
-    # Try an alternative approach as well - using cast calldata
-    print("Alternative approach with cast calldata...")
-    calldata_cmd = [
-        "cast", "calldata", 
-        "f(uint256,uint256,uint256)", 
-        op_code, 
-        str(gas_threshold), 
-        "0x0000000000000000000000000000000000000000"
-    ]
-    print(f"Running: {' '.join(calldata_cmd)}")
-    result = subprocess.run(calldata_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error generating calldata: {result.stderr}")
-    else:
-        alt_tx_data = result.stdout.strip()
-        print(f"Alternative transaction data: {alt_tx_data}")
-        # Use this alternative data if available
-        if alt_tx_data.startswith("0x") and len(alt_tx_data) >= 10:
-            tx_data = alt_tx_data
-            print(f"Using alternative transaction data")
+    # Append the gas threshold and a zero third argument to the precomputed
+    # selector and operation code for this attack type
+    params = encode(["uint256", "uint256"], [gas_threshold, 0])
+    tx_data = "0x" + (ATTACK_CALLDATA_PREFIXES[attack_type] + params).hex()
+    print(f"Transaction data: {tx_data}")
     
     # Send the transaction
-    send_cmd = [
-        "cast", "send",
-        "--rpc-url", rpc_url,
-        "--private-key", private_key,
-        "--gas-limit", str(gas_limit),
-        contract_address,
-        tx_data
-    ]
-    print(f"Sending transaction: cast send --rpc-url <url> --private-key <key> --gas-limit {gas_limit} {contract_address} {tx_data}")
-    
-    result = subprocess.run(send_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
+    print(f"Sending transaction to {contract_address} with gas limit {gas_limit}")
+    try:
+        receipt = send_transaction(w3, private_key, {"to": contract_address, "data": tx_data, "gas": gas_limit})
+    except Exception as e:
         # Check for common errors like nonce issues or insufficient funds
-        stderr_lower = result.stderr.lower()
-        if "insufficient funds" in stderr_lower:
+        error_lower = str(e).lower()
+        if "insufficient funds" in error_lower:
              print(f"Transaction failed: Insufficient funds for account.")
-        elif "nonce too low" in stderr_lower or "invalid nonce" in stderr_lower:
+        elif "nonce too low" in error_lower or "invalid nonce" in error_lower:
             print(f"Transaction failed: Nonce issue. Try again or reset Anvil account state.")
         else:
-            print(f"Error sending transaction: {result.stderr}")
+            print(f"Error sending transaction: {e}")
         sys.exit(1)
     
-    # Extract transaction hash from output
-    output = result.stdout
-    # Try parsing as JSON first
+    tx_hash = Web3.to_hex(receipt.transactionHash)
+    print(f"Transaction sent: {tx_hash}")
+    return tx_hash, receipt.blockNumber
+
+def create_rpc_session() -> requests.Session:
+    """Create a keep-alive HTTP session with a pooled, retrying adapter for RPC calls"""
+    session = requests.Session()
+    # Size the connection pool so the parallel fallback never waits on a socket
+    adapter = HTTPAdapter(
+        pool_connections=RPC_POOL_SIZE,
+        pool_maxsize=RPC_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def rpc_batch(session: requests.Session, rpc_url: str, calls: List[Tuple[str, List]]) -> List[Dict]:
+    """Send JSON-RPC calls as batched POSTs and return the responses in call order"""
+    responses = []
+    for offset in range(0, len(calls), RPC_BATCH_SIZE):
+        chunk = calls[offset:offset + RPC_BATCH_SIZE]
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        result = session.post(rpc_url, json=payload)
+        result.raise_for_status()
+        items = json_loads(result.content)
+        if not isinstance(items, list):
+            raise ValueError(f"RPC endpoint does not support batch requests: {items}")
+        
+        # Batch responses may come back in any order, so match them up by id
+        by_id = {item.get("id"): item for item in items}
+        for i in range(len(chunk)):
+            responses.append(by_id.get(i, {"error": "missing response in batch"}))
+    
+    return responses
+
+def rpc_call(session: requests.Session, rpc_url: str, method: str, params: List) -> Dict:
+    """Send a single JSON-RPC call and return its response object"""
+    result = session.post(rpc_url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    result.raise_for_status()
+    return json_loads(result.content)
+
+def block_calls(block_nums: List[int], attack_block: int) -> List[Tuple[str, List]]:
+    """Build the eth_getBlockByNumber calls for a list of block numbers"""
+    # Only the attack block needs full transaction objects; the blocks in
+    # between are fetched with transaction hashes only
+    return [
+        ("eth_getBlockByNumber", [hex(block_num), block_num == attack_block])
+        for block_num in block_nums
+    ]
+
+def serialize_blocks(
+    block_nums: List[int],
+    responses: List[Dict],
+    attack_block: int,
+    manifest_only: bool = False,
+) -> List[Tuple[int, Optional[bytes], Optional[str]]]:
+    """Turn RPC responses into (block number, serialized block, error) tuples"""
+    results = []
+    for block_num, response in zip(block_nums, responses):
+        if "error" in response:
+            results.append((block_num, None, str(response["error"])))
+            continue
+        block = response["result"]
+        # In lazy mode the blocks before the attack only record the parent chain
+        if manifest_only and block_num != attack_block and block:
+            block = {field: block.get(field) for field in MANIFEST_FIELDS}
+        results.append((block_num, json_dumps(block), None))
+    return results
+
+def fetch_block_chunk(
+    session: requests.Session,
+    rpc_url: str,
+    block_nums: List[int],
+    attack_block: int,
+    manifest_only: bool = False,
+) -> List[Tuple[int, Optional[bytes], Optional[str]]]:
+    """Fetch a chunk of blocks, in one batch when it holds several, and serialize each one"""
+    calls = block_calls(block_nums, attack_block)
     try:
-        receipt_json = json.loads(output)
-        tx_hash = receipt_json.get("transactionHash")
-        if tx_hash and tx_hash.startswith("0x") and len(tx_hash) == 66:
-             print(f"Transaction sent: {tx_hash}")
-             return tx_hash
+        if len(calls) == 1:
+            responses = [rpc_call(session, rpc_url, *calls[0])]
         else:
-            print(f"Could not find valid 'transactionHash' in cast send output JSON: {output}")
-            # Don't exit, try text parsing
-    except json.JSONDecodeError:
-        pass # Expected if output is not JSON, try text parsing
-
-    # Fallback: Parse text output for transaction hash
-    for line in output.split("\n"):
-        line_stripped = line.strip()
-        # Look for lines starting with 'transactionHash'
-        if line_stripped.lower().startswith("transactionhash"):
-            parts = line_stripped.split()
-            if len(parts) >= 2:
-                potential_hash = parts[-1]
-                if potential_hash.startswith("0x") and len(potential_hash) == 66:
-                    print(f"Transaction sent: {potential_hash}")
-                    return potential_hash
-        # Original check as a final fallback
-        elif line_stripped.startswith("0x") and len(line_stripped) == 66:
-            tx_hash = line_stripped
-            print(f"Transaction sent: {tx_hash}")
-            return tx_hash
-    
-    print(f"Could not find transaction hash in cast output: {output}")
-    sys.exit(1)
-
-def get_block_data(w3: Web3, tx_hash: str, fork_block: int) -> Dict:
-    """Get the block data containing the transaction and all blocks since fork"""
-    print("Retrieving block data...")
+            responses = rpc_batch(session, rpc_url, calls)
+    except (requests.RequestException, ValueError) as e:
+        responses = [{"error": str(e)}] * len(calls)
     
-    # Wait for transaction to be mined
+    return serialize_blocks(block_nums, responses, attack_block, manifest_only)
+
+def fetch_blocks(
+    session: requests.Session,
+    rpc_url: str,
+    block_nums: List[int],
+    attack_block: int,
+    manifest_only: bool = False,
+) -> Iterator[Tuple[int, Optional[bytes], Optional[str]]]:
+    """Yield (block number, serialized block, error) tuples in block order"""
+    # Common case: the attack landed in the first block after the fork, so a
+    # single request covers the whole range
+    if len(block_nums) == 1:
+        yield from fetch_block_chunk(session, rpc_url, block_nums, attack_block, manifest_only)
+        return
+    
+    # Use the first batch to find out whether the endpoint accepts batches
+    first_chunk = block_nums[:RPC_BATCH_SIZE]
+    try:
+        responses = rpc_batch(session, rpc_url, block_calls(first_chunk, attack_block))
+        yield from serialize_blocks(first_chunk, responses, attack_block, manifest_only)
+        chunk_size, remaining = RPC_BATCH_SIZE, block_nums[RPC_BATCH_SIZE:]
+    except (requests.RequestException, ValueError) as e:
+        print(f"Batch request failed ({e}), falling back to parallel requests...")
+        chunk_size, remaining = 1, block_nums
+    
+    # Fetch and serialize several chunks at once from a thread pool, keeping a
+    # bounded window in flight so blocks are still yielded in order
+    chunks = [remaining[i:i + chunk_size] for i in range(0, len(remaining), chunk_size)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=RPC_FETCH_WORKERS) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(fetch_block_chunk, session, rpc_url, chunk, attack_block, manifest_only))
+            if len(pending) >= RPC_FETCH_WORKERS:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def wait_for_block_number(session: requests.Session, rpc_url: str, tx_hash: str) -> int:
+    """Wait for a transaction to be mined and return its block number"""
     receipt = None
-    max_attempts = 30
+    max_attempts = 40
+    delay = 0.05
     for _ in range(max_attempts):
         try:
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-            if receipt and receipt.blockNumber:
+            receipt = rpc_call(session, rpc_url, "eth_getTransactionReceipt", [tx_hash]).get("result")
+            if receipt and receipt.get("blockNumber"):
                 break
-        except Exception:
+        except requests.RequestException:
             pass
-        time.sleep(1)
+        # Back off exponentially: Anvil usually mines within a few milliseconds
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
     
-    if not receipt or not receipt.blockNumber:
+    if not receipt or not receipt.get("blockNumber"):
         print(f"Transaction not mined after {max_attempts} attempts")
         sys.exit(1)
     
-    block_number = receipt.blockNumber
-    print(f"Transaction mined in block {block_number}")
-    
-    # Calculate block range to fetch
-    start_block = fork_block + 1  # Start from block after fork
-    end_block = block_number      # End at the attack block
-    
-    # Fetch all blocks in range
-    blocks = {}
-    print(f"Fetching all blocks from {start_block} to {end_block}...")
-    
-    for block_num in range(start_block, end_block + 1):
-        try:
-            print(f"Fetching block {block_num}...")
-            block = w3.eth.get_block(block_num, full_transactions=True)
-            blocks[block_num] = block
-        except Exception as e:
-            print(f"Error fetching block {block_num}: {e}")
-    
-    # Also save the attack transaction's block number for reference
-    blocks['attack_block_number'] = block_number
-    
-    return blocks
+    return int(receipt["blockNumber"], 16)
 
-def save_block_data(blocks: Dict, output_file: str):
-    """Save all block data to a single JSON file with a 'blocks' key."""
+def stream_blocks_to_file(
+    session: requests.Session,
+    rpc_url: str,
+    tx_hash: str,
+    fork_block: int,
+    output_file: str,
+    block_number: Optional[int] = None,
+    pretty: bool = False,
+    blocks_mode: str = "attack-only",
+    compress: bool = False,
+):
+    """Fetch the blocks selected by blocks_mode and write each one to the output file as it arrives"""
+    print("Retrieving block data...")
+    
     output_path = Path(output_file)
     output_dir = output_path.parent
     
@@ -405,97 +547,110 @@ def save_block_data(blocks: Dict, output_file: str):
         print(f"Error creating directory {output_dir}: {e}")
         sys.exit(1)
     
-    # Get the attack block number
-    attack_block_number = blocks.get('attack_block_number')
-    if not attack_block_number:
-        print("Warning: Could not determine attack block number")
-    
-    # Remove the special 'attack_block_number' key before processing blocks
-    if 'attack_block_number' in blocks:
-        del blocks['attack_block_number']
-    
-    # Create a dictionary to hold all block data
-    output_data = {
-        "attackBlockNumber": attack_block_number,
-        "blocks": {}
-    }
+    # Wait for transaction to be mined, unless the sender already reported its block
+    if block_number is None:
+        block_number = wait_for_block_number(session, rpc_url, tx_hash)
+    print(f"Transaction mined in block {block_number}")
     
-    # Convert all blocks to serializable format and add to output
-    print(f"Processing {len(blocks)} blocks...")
-    for block_num, block_data in blocks.items():
-        try:
-            # Convert block data to serializable format
-            serializable_block = json.loads(Web3.to_json(block_data))
-            output_data["blocks"][str(block_num)] = serializable_block
-            print(f"Processed block {block_num}")
-        except Exception as e:
-            print(f"Error processing block {block_num}: {e}")
-            # Attempt to manually serialize if possible
-            try:
-                serializable_block = {k: str(v) if isinstance(v, bytes) else v for k, v in dict(block_data).items()}
-                # Further refine serialization for AttributeDict within transactions if needed
-                if 'transactions' in serializable_block:
-                    serializable_block['transactions'] = [
-                        {k: str(v) if isinstance(v, bytes) else v for k, v in dict(tx).items()}
-                        for tx in serializable_block['transactions']
-                    ]
-                output_data["blocks"][str(block_num)] = serializable_block
-                print(f"Processed block {block_num} using simplified serialization")
-            except Exception as e2:
-                print(f"Failed to process block {block_num} even with simplified serialization: {e2}")
-    
-    # Save the complete data structure to the output file
-    print(f"Saving all blocks to {output_path}...")
-    with open(output_path, "w") as f:
-        json.dump(output_data, f, indent=2)
+    # Calculate block range to fetch
+    start_block = fork_block + 1  # Start from block after fork
+    end_block = block_number      # End at the attack block
+    if blocks_mode == "attack-only":
+        start_block = end_block
+    block_nums = list(range(start_block, end_block + 1))
+    
+    # Write each block's JSON into the output file as soon as its batch is
+    # fetched, so only one batch of blocks is ever held in memory
+    print(f"Fetching blocks {start_block} to {end_block} into {output_path}...")
+    total = len(block_nums)
+    progress_step = max(1, total // PROGRESS_UPDATES)
+    saved_count = 0
+    with open_output(output_path, compress, "w") as f:
+        f.write(b'{"attackBlockNumber": %d, "blocks": {' % block_number)
+        for i, (block_num, block_json, error) in enumerate(fetch_blocks(session, rpc_url, block_nums, end_block, blocks_mode == "lazy"), 1):
+            if error:
+                print(f"Error fetching block {block_num}: {error}")
+            else:
+                if saved_count:
+                    f.write(b",")
+                f.write(b'"%d": ' % block_num + block_json)
+                saved_count += 1
+            if i % progress_step == 0 or i == total:
+                print(f"Fetched {i}/{total} blocks")
+        f.write(b"}}")
+    
+    # Re-indent the file only when a human-readable artifact was requested
+    if pretty:
+        with open_output(output_path, compress, "r") as f:
+            output_data = json_loads(f.read())
+        with open_output(output_path, compress, "w") as f:
+            f.write(json_dumps(output_data, pretty=True))
     
     print(f"All blocks saved successfully to {output_path}")
-    print(f"Saved data for {len(output_data['blocks'])} blocks with attack block #{attack_block_number}")
+    print(f"Saved data for {saved_count} blocks with attack block #{block_number}")
 
 def main():
     args = parse_args()
+    local_rpc_url = f"http://localhost:{args.anvil_port}"
     
-    # Start anvil process
-    anvil_process = start_anvil(args.rpc_url, args.fork_block, args.anvil_port)
+    # Compile the contract while Anvil is forking
+    build_process = start_contract_build(args.contract_path)
     
     try:
-        local_rpc_url = f"http://localhost:{args.anvil_port}"
-        w3 = Web3(Web3.HTTPProvider(local_rpc_url))
-        
-        # Verify connection to anvil
-        if not w3.is_connected():
-            print(f"Failed to connect to Anvil at {local_rpc_url}")
-            sys.exit(1)
-        
-        # Deploy contract
-        contract_address = deploy_contract(args.contract_path, local_rpc_url, args.private_key)
-        
-        # Execute attack transaction
-        tx_hash = execute_attack_tx(
-            contract_address,
-            args.attack_type,
-            args.gas_limit,
-            args.gas_threshold,
-            local_rpc_url,
-            args.private_key
-        )
-        
-        # Get block data for all blocks from fork to attack
-        blocks_data = get_block_data(w3, tx_hash, args.fork_block)
-        
-        # Save block data
-        save_block_data(blocks_data, args.output_file)
-        
-        print("Block generation completed successfully!")
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        # Every RPC call below shares one keep-alive session
+        with create_rpc_session() as session:
+            # Start anvil process
+            anvil_process = start_anvil(args.rpc_url, args.fork_block, args.anvil_port)
+            
+            try:
+                w3 = Web3(Web3.HTTPProvider(local_rpc_url, session=session))
+                
+                # Verify connection to anvil
+                if not w3.is_connected():
+                    print(f"Failed to connect to Anvil at {local_rpc_url}")
+                    sys.exit(1)
+                
+                # Deploy contract
+                contract_address = deploy_contract(w3, args.contract_path, args.private_key, build_process)
+                
+                # Execute attack transaction
+                tx_hash, block_number = execute_attack_tx(
+                    w3,
+                    contract_address,
+                    args.attack_type,
+                    args.gas_limit,
+                    args.gas_threshold,
+                    args.private_key
+                )
+                
+                # Fetch all blocks from fork to attack and save them to the output file
+                stream_blocks_to_file(
+                    session,
+                    local_rpc_url,
+                    tx_hash,
+                    args.fork_block,
+                    args.output_file,
+                    block_number,
+                    args.pretty,
+                    args.blocks_mode,
+                    args.compress,
+                )
+                
+                print("Block generation completed successfully!")
+            
+            except Exception as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            finally:
+                # Terminate anvil process
+                print("Terminating Anvil...")
+                anvil_process.terminate()
+                anvil_process.wait(timeout=5)
     finally:
-        # Terminate anvil process
-        print("Terminating Anvil...")
-        anvil_process.terminate()
-        anvil_process.wait(timeout=5)
+        # Don't leave forge running if we exit before deploy_contract waited on it
+        if build_process is not None and build_process.poll() is None:
+            build_process.terminate()
+            build_process.wait(timeout=5)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -8,22 +8,123 @@ Simplified script for targeting Flashbots transactions on hundred-block boundari
 import os
 import sys
 import json
+import queue
+import atexit
 import time
+import threading
 import uuid
+import random
 import asyncio
+import contextlib
 import logging
+import logging.handlers
 import aiohttp
-import traceback
 import datetime
-from typing import List, Optional, Dict, Any
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import List, Optional, Dict, Any, Tuple, Union
 from pathlib import Path
 
-from dotenv import load_dotenv
 from web3 import Web3, HTTPProvider
 from web3.exceptions import TransactionNotFound
 from eth_abi import encode
-from eth_account import Account, messages
+from eth_account import Account
+from eth_keys import keys
+from eth_utils import function_signature_to_4byte_selector, keccak
 from eth_typing import Address
+from hexbytes import HexBytes
+
+# orjson serializes the status and relay payloads several times faster than
+# the standard library; fall back to json when it is missing
+try:
+    import orjson
+
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+
+    json_dumps_bytes = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2 if pretty else None)
+
+    def json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    json_loads = json.loads
+
+# Connection pool size of the HTTP session shared by every RPC call
+RPC_POOL_SIZE = 32
+
+# Seconds before a request to the Ethereum node is abandoned
+RPC_TIMEOUT = 10
+
+# Seconds between block number polls when no websocket endpoint is configured
+BLOCK_POLL_INTERVAL = 3.0
+
+# Upper bound on a single poll sleep while the target block is still far away
+BLOCK_POLL_MAX_INTERVAL = 15.0
+
+# Seconds per post-merge slot, used to estimate when the next blocks arrive
+SLOT_TIME = 12
+
+# Seconds without a newHeads message before the websocket wait falls back to polling
+WS_HEAD_TIMEOUT = 2 * SLOT_TIME
+
+# Connection pool size of the aiohttp session shared by every relay request
+RELAY_POOL_SIZE = 32
+
+# Seconds an idle relay connection is kept open for reuse
+RELAY_KEEPALIVE_TIMEOUT = 75
+
+# Seconds the relay hostname resolution is cached
+RELAY_DNS_CACHE_TTL = 600
+
+# Seconds before a relay request is abandoned
+RELAY_TIMEOUT = 10
+
+# EIP-191 personal message prefix for a 0x-prefixed 32-byte hex digest (66 characters)
+FLASHBOTS_MESSAGE_PREFIX = b"\x19Ethereum Signed Message:\n66"
+
+# Number of times a submitted bundle is re-sent to the relay before its target block
+BUNDLE_RESUBMIT_ATTEMPTS = 40
+
+# Base delay in seconds between bundle resubmissions; grows linearly per attempt
+BUNDLE_RESUBMIT_DELAY = 0.05
+
+# Priority fee offered to the block builder for the attack transaction
+MAX_PRIORITY_FEE = Web3.to_wei(0.1, 'gwei')
+
+# Headroom added on top of the current base fee for maxFeePerGas
+BASE_FEE_BUFFER = Web3.to_wei(1, 'gwei')
+
+# Extra priority fee added for each failed attempt, and the most that may be added
+PRIORITY_FEE_BUMP = Web3.to_wei(0.1, 'gwei')
+MAX_PRIORITY_FEE_BUMP = Web3.to_wei(2, 'gwei')
+
+# Blocks before the target at which an attempt fetches fee state and signs its transaction
+PREPARE_LEAD_BLOCKS = 5
+
+# Base delay in seconds before re-attempting a target block that has not passed yet;
+# doubles with each consecutive failure (up to 2**6) and is jittered by +/-25%
+RETRY_BACKOFF_BASE = 1.0
+
+# Blocks a fetched Flashbots user stats response is reused for (~1 hour); priority
+# status changes over days, and retries are a hundred blocks apart
+USER_STATS_CACHE_BLOCKS = 300
+
+# Gas per attacked contract (86k gas for 12 contracts) and the headroom (20%) applied on top
+GAS_PER_CONTRACT = 7167
+GAS_LIMIT_BUFFER = 1.2
+
+# Checksummed targets used when big-contracts.csv cannot be loaded
+FALLBACK_CONTRACT_TARGETS = (
+    Web3.to_checksum_address("0x1908D2bD020Ba25012eb41CF2e0eAd7abA1c48BC"),
+)
+
+# 0x-prefixed 4-byte selector of the attack entry point
+EXECUTE_ATTACK_SELECTOR = "0x" + function_signature_to_4byte_selector("executeAttack(address[])").hex()
 
 # Configure logging
 def setup_logging():
@@ -38,6 +139,7 @@ def setup_logging():
     
     # Configure root logger
     root_logger = logging.getLogger()
+    # LOG_LEVEL is applied in main() once .env has been loaded
     root_logger.setLevel(logging.INFO)
     
     # Log format
@@ -46,21 +148,62 @@ def setup_logging():
     # Configure console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_format)
-    root_logger.addHandler(console_handler)
     
     # Configure file handler
     file_handler = logging.FileHandler(log_filename)
     file_handler.setFormatter(log_format)
-    root_logger.addHandler(file_handler)
+    
+    # Records are queued and written by a background thread so console and
+    # file writes never block the event loop
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
     
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging to file: {log_filename}")
+    logger.info("Logging to file: %s", log_filename)
     
     return logger
 
 # Initialize logger
 logger = setup_logging()
 
+def create_rpc_session() -> requests.Session:
+    """
+    Create a keep-alive HTTP session with a pooled, retrying adapter.
+    
+    Returns:
+        Session for web3 and raw JSON-RPC batches on a single thread
+    """
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+    adapter = HTTPAdapter(
+        pool_connections=RPC_POOL_SIZE,
+        pool_maxsize=RPC_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def to_0x_hex(tx: Union[bytes, str]) -> str:
+    """
+    Convert a signed transaction to a 0x-prefixed hex string in a single pass.
+    
+    Args:
+        tx: Raw transaction bytes or hex string
+    
+    Returns:
+        0x-prefixed hex string
+    """
+    if isinstance(tx, bytes):
+        # bytes.hex avoids HexBytes.hex, whose 0x prefix differs between versions
+        return "0x" + bytes.hex(tx)
+    return tx if tx.startswith("0x") else "0x" + tx
+
 class ZKarnageError(Exception):
     """Base exception for ZKarnage errors."""
     pass
@@ -72,30 +215,252 @@ class FlashbotsManager:
         self.w3 = w3
         self.relay_url = relay_url
         self.account = account
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Key material reused by every signed relay request
+        self._address = account.address
+        self._private_key = keys.PrivateKey(bytes(account.key))
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared relay session, creating it on first use.
+        
+        Returns:
+            Long-lived session that keeps relay connections alive between calls
+        """
+        if self._session is None or self._session.closed:
+            # Every request goes to the one relay host, so bound the pool per host too
+            connector = aiohttp.TCPConnector(
+                limit=RELAY_POOL_SIZE,
+                limit_per_host=RELAY_POOL_SIZE,
+                keepalive_timeout=RELAY_KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=RELAY_DNS_CACHE_TTL,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=RELAY_TIMEOUT),
+                headers={'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+            )
+        return self._session
     
-    def _sign_flashbots_message(self, msg_body: str) -> str:
+    async def close(self):
+        """Close the shared relay session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    def _sign_flashbots_message(self, msg_body: bytes) -> str:
         """
         Create Flashbots-compatible signature for request authentication.
         
         Args:
-            msg_body: JSON payload to be signed
+            msg_body: Encoded JSON payload to be signed, exactly as it is posted
         
         Returns:
             Signed message string in format 'address:signature'
         """
-        # Get hash as hex string
-        message_hash_hex = self.w3.keccak(text=msg_body).hex()
+        # Get hash as 0x-prefixed hex string
+        message_hash_hex = "0x" + keccak(msg_body).hex()
         
-        # Create message object using the hash hex string
-        message = messages.encode_defunct(text=message_hash_hex)
+        # Hash the EIP-191 personal message wrapping the hex string
+        message_hash = keccak(FLASHBOTS_MESSAGE_PREFIX + message_hash_hex.encode())
         
-        # Sign the message
-        signed_message = self.w3.eth.account.sign_message(message, self.account.key)
+        # Sign the digest with the cached private key, using the 27/28 recovery id
+        signed = self._private_key.sign_msg_hash(message_hash)
+        signature_bytes = signed.r.to_bytes(32, "big") + signed.s.to_bytes(32, "big") + bytes([signed.v + 27])
         
         # Format as address:signature
-        signature = f"{self.account.address}:{signed_message.signature.hex()}"
+        return f"{self._address}:0x{signature_bytes.hex()}"
+    
+    def _call_bundle_request(
+        self, 
+        bundle: List[bytes], 
+        target_block: int, 
+        state_block: str = 'latest'
+    ) -> Dict[str, Any]:
+        """
+        Build an eth_callBundle request.
+        
+        Args:
+            bundle: List of signed transaction bytes
+            target_block: Block number to target
+            state_block: State block to base simulation on
+        
+        Returns:
+            JSON-RPC request dictionary
+        """
+        # Convert transactions to 0x-prefixed hex strings for Flashbots
+        hex_txs = [to_0x_hex(tx) for tx in bundle]
+        
+        # Debug print transaction data
+        logger.info("Transaction data (first 100 chars): %s...", hex_txs[0][:100])
+        logger.info("Transaction type: %s", hex_txs[0][2:4])  # Print transaction type (first byte after 0x)
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_callBundle",
+            "params": [{
+                "txs": hex_txs,
+                "blockNumber": hex(target_block),
+                "stateBlockNumber": state_block,
+                "timestamp": int(time.time())
+            }]
+        }
+    
+    def _simulation_result(self, result: Dict[str, Any], target_block: int) -> Dict[str, Any]:
+        """
+        Log an eth_callBundle response and summarize it.
+        
+        Args:
+            result: Parsed JSON-RPC response
+            target_block: Block number the bundle targets
+        
+        Returns:
+            Simulation result dictionary
+        """
+        # Log simulation details
+        logger.info("Bundle simulation for block %s", target_block)
+        logger.info("Gas used: %s", result.get('result', {}).get('totalGasUsed', 'N/A'))
+        
+        # Check for simulation success (no reverts)
+        bundle_results = result.get('result', {}).get('results', [])
+        success = all(
+            not (res.get('error') or res.get('revert')) 
+            for res in bundle_results
+        )
+        
+        return {
+            "success": success,
+            "details": result.get('result', {}),
+            "raw_result": result
+        }
+    
+    def _user_stats_request(self, block_number: int) -> Dict[str, Any]:
+        """
+        Build a flashbots_getUserStatsV2 request.
+        
+        Args:
+            block_number: A recent block number (required to prevent replay attacks)
+        
+        Returns:
+            JSON-RPC request dictionary
+        """
+        return {
+            "jsonrpc": "2.0",
+            "id": int(time.time() * 1000),
+            "method": "flashbots_getUserStatsV2",
+            "params": [{
+                "blockNumber": hex(block_number)
+            }]
+        }
+    
+    def _log_user_stats(self, result: Dict[str, Any]) -> None:
+        """
+        Log meaningful information from a flashbots_getUserStatsV2 response.
+        
+        Args:
+            result: Parsed JSON-RPC response
+        """
+        if 'result' not in result:
+            return
+        
+        stats = result.get('result', {})
+        is_high_priority = stats.get('isHighPriority', False)
+        logger.info("User has %s priority status", 'HIGH' if is_high_priority else 'STANDARD')
+        
+        # Format payments as ETH for better readability
+        all_time_payments = stats.get('allTimeValidatorPayments', '0')
+        all_time_eth = float(all_time_payments) / 1e18 if all_time_payments else 0
+        logger.info("All-time validator payments: %.4f ETH", all_time_eth)
+        
+        last_7d_payments = stats.get('last7dValidatorPayments', '0')
+        last_7d_eth = float(last_7d_payments) / 1e18 if last_7d_payments else 0
+        logger.info("Last 7 days validator payments: %.4f ETH", last_7d_eth)
+        
+        # Log gas usage
+        all_time_gas = stats.get('allTimeGasSimulated', '0')
+        logger.info("All-time gas simulated: %s", all_time_gas)
+    
+    async def batch_call(self, calls: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Send several relay JSON-RPC requests as one signed HTTP POST.
+        
+        Args:
+            calls: JSON-RPC request dictionaries with distinct ids
+        
+        Returns:
+            Responses in request order, or None if the relay rejected the batch
+        """
+        request_body = json_dumps_bytes(calls)
+        logger.debug("Batch request: %s", request_body)
+        
+        # One signature covers the whole batch
+        headers = {'X-Flashbots-Signature': self._sign_flashbots_message(request_body)}
+        
+        session = await self._get_session()
+        async with session.post(
+            self.relay_url, 
+            data=request_body, 
+            headers=headers
+        ) as response:
+            response_text = await response.text()
+            logger.debug("Batch response: %s", response_text)
+            
+            if response.status != 200:
+                return None
+            
+            results = json_loads(response_text)
+        
+        # Relays without batch support answer with a single error object
+        if not isinstance(results, list):
+            return None
+        
+        by_id = {result.get('id'): result for result in results}
+        if any(call['id'] not in by_id for call in calls):
+            return None
+        
+        return [by_id[call['id']] for call in calls]
+    
+    async def simulate_bundle_with_user_stats(
+        self, 
+        bundle: List[bytes], 
+        target_block: int, 
+        block_number: int
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Simulate a bundle and fetch user stats in a single batched relay request.
+        
+        Falls back to separate requests if the relay rejects the batch.
         
-        return signature
+        Args:
+            bundle: List of signed transaction bytes
+            target_block: Block number to target
+            block_number: A recent block number for the user stats request
+        
+        Returns:
+            Tuple of (simulation result dictionary, user stats response)
+        """
+        sim_request = self._call_bundle_request(bundle, target_block)
+        stats_request = self._user_stats_request(block_number)
+        stats_request["id"] = sim_request["id"] + 1
+        
+        try:
+            responses = await self.batch_call([sim_request, stats_request])
+        except Exception as e:
+            logger.warning("Batched relay request failed: %s", e)
+            responses = None
+        
+        if responses is None:
+            logger.info("Relay did not accept the batched request, sending requests separately")
+            sim_result = await self.simulate_bundle(bundle, target_block)
+            user_stats = await self.check_user_stats(block_number)
+            return sim_result, user_stats
+        
+        sim_response, user_stats = responses
+        self._log_user_stats(user_stats)
+        return self._simulation_result(sim_response, target_block), user_stats
     
     async def simulate_bundle(
         self, 
@@ -115,84 +480,44 @@ class FlashbotsManager:
             Simulation result dictionary
         """
         try:
-            # Convert transactions to hex strings without the 0x prefix for Flashbots
-            hex_txs = [tx.hex() if not isinstance(tx, str) else tx for tx in bundle]
-            
-            # Ensure 0x prefix for Flashbots
-            hex_txs = ["0x" + tx[2:] if tx.startswith("0x") else "0x" + tx for tx in hex_txs]
-            
-            # Debug print transaction data
-            logger.info(f"Transaction data (first 100 chars): {hex_txs[0][:100]}...")
-            logger.info(f"Transaction type: {hex_txs[0][2:4]}")  # Print transaction type (first byte after 0x)
-            
             # Prepare simulation request
-            sim_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "eth_callBundle",
-                "params": [{
-                    "txs": hex_txs,
-                    "blockNumber": hex(target_block),
-                    "stateBlockNumber": state_block,
-                    "timestamp": int(time.time())
-                }]
-            }
+            sim_request = self._call_bundle_request(bundle, target_block, state_block)
             
             # Convert request to JSON
-            request_json = json.dumps(sim_request)
+            request_body = json_dumps_bytes(sim_request)
             
             # Debug print request
-            logger.info(f"Simulation request: {request_json}")
+            logger.debug("Simulation request: %s", request_body)
             
             # Sign the request
-            signature = self._sign_flashbots_message(request_json)
+            signature = self._sign_flashbots_message(request_body)
             
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Flashbots-Signature': signature
-            }
+            # The session already sends Content-Type, only the signature varies
+            headers = {'X-Flashbots-Signature': signature}
             
             # Debug print headers
-            logger.info(f"Request headers: {headers}")
+            logger.debug("Request headers: %s", headers)
             
             # Send simulation request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.relay_url, 
-                    data=request_json, 
-                    headers=headers
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"Response status: {response.status}")
-                    logger.info(f"Response body: {response_text}")
-                    
-                    if response.status != 200:
-                        logger.error(f"Simulation request failed with status {response.status}")
-                        return {"success": False, "error": response_text}
-                    
-                    result = json.loads(response_text)
-                    
-                    # Log simulation details
-                    logger.info(f"Bundle simulation for block {target_block}")
-                    logger.info(f"Gas used: {result.get('result', {}).get('totalGasUsed', 'N/A')}")
-                    
-                    # Check for simulation success (no reverts)
-                    bundle_results = result.get('result', {}).get('results', [])
-                    success = all(
-                        not (res.get('error') or res.get('revert')) 
-                        for res in bundle_results
-                    )
-                    
-                    return {
-                        "success": success,
-                        "details": result.get('result', {}),
-                        "raw_result": result
-                    }
+            session = await self._get_session()
+            async with session.post(
+                self.relay_url, 
+                data=request_body, 
+                headers=headers
+            ) as response:
+                response_text = await response.text()
+                logger.info("Response status: %s", response.status)
+                logger.debug("Response body: %s", response_text)
+                
+                if response.status != 200:
+                    logger.error("Simulation request failed with status %s", response.status)
+                    return {"success": False, "error": response_text}
+                
+                result = json_loads(response_text)
+                return self._simulation_result(result, target_block)
         
         except Exception as e:
-            logger.error(f"Bundle simulation failed: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Bundle simulation failed: %s", e)
             return {"success": False, "error": str(e)}
     
     async def submit_bundle(
@@ -200,7 +525,9 @@ class FlashbotsManager:
         bundle: List[bytes], 
         target_block: int, 
         min_timestamp: Optional[int] = None,
-        max_timestamp: Optional[int] = None
+        max_timestamp: Optional[int] = None,
+        replacement_uuid: Optional[str] = None,
+        resubmission: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         Submit bundle to Flashbots relay using eth_sendBundle.
@@ -210,176 +537,203 @@ class FlashbotsManager:
             target_block: Block number to target
             min_timestamp: Minimum timestamp for bundle validity
             max_timestamp: Maximum timestamp for bundle validity
+            replacement_uuid: Replacement UUID shared by resubmissions of the same bundle
+            resubmission: Whether this re-sends an already submitted bundle; its
+                progress is then only logged at DEBUG level
         
         Returns:
             Bundle submission result dictionary
         """
+        # Repeated resubmissions would otherwise flood the INFO log
+        log_level = logging.DEBUG if resubmission else logging.INFO
+        
         try:
             # Convert transactions to hex strings with 0x prefix
-            hex_txs = [tx.hex() if not isinstance(tx, str) else tx for tx in bundle]
-            hex_txs = ["0x" + tx[2:] if tx.startswith("0x") else "0x" + tx for tx in hex_txs]
+            hex_txs = [to_0x_hex(tx) for tx in bundle]
             
             # Debug print transaction data
-            logger.info(f"Transaction data (first 100 chars): {hex_txs[0][:100]}...")
-            logger.info(f"Transaction type: {hex_txs[0][2:4]}")  # Print transaction type (first byte after 0x)
+            logger.log(log_level, "Transaction data (first 100 chars): %s...", hex_txs[0][:100])
+            logger.log(log_level, "Transaction type: %s", hex_txs[0][2:4])  # Print transaction type (first byte after 0x)
+            
+            # One clock read serves both the request id and the default expiry
+            now = time.time()
             
             # Prepare bundle submission request
             bundle_request = {
                 "jsonrpc": "2.0",
-                "id": int(time.time() * 1000),  # Unique ID
+                "id": int(now * 1000),  # Unique ID
                 "method": "eth_sendBundle",
                 "params": [{
                     "txs": hex_txs,
                     "blockNumber": hex(target_block),
-                    "minTimestamp": min_timestamp or 0,
-                    "maxTimestamp": max_timestamp or int(time.time()) + 420,  # 7 minutes from now
-                    "replacementUuid": str(uuid.uuid4())
+                    "minTimestamp": min_timestamp if min_timestamp is not None else 0,
+                    "maxTimestamp": max_timestamp if max_timestamp is not None else int(now) + 420,  # 7 minutes from now
+                    "replacementUuid": replacement_uuid or str(uuid.uuid4())
                 }]
             }
             
             # Convert request to JSON
-            request_json = json.dumps(bundle_request)
+            request_body = json_dumps_bytes(bundle_request)
             
             # Debug print request
-            logger.info(f"Bundle submission request: {request_json}")
+            logger.debug("Bundle submission request: %s", request_body)
             
             # Sign the request
-            signature = self._sign_flashbots_message(request_json)
+            signature = self._sign_flashbots_message(request_body)
             
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Flashbots-Signature': signature
-            }
+            # The session already sends Content-Type, only the signature varies
+            headers = {'X-Flashbots-Signature': signature}
             
             # Debug print headers
-            logger.info(f"Request headers: {headers}")
+            logger.debug("Request headers: %s", headers)
             
             # Send bundle submission request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.relay_url, 
-                    data=request_json, 
-                    headers=headers
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"Response status: {response.status}")
-                    logger.info(f"Response body: {response_text}")
-                    
-                    if response.status != 200:
-                        logger.error(f"Bundle submission failed with status {response.status}")
-                        return None
-                    
-                    result = json.loads(response_text)
-                    
-                    # Extract bundle hash
-                    bundle_hash = result.get('result', {}).get('bundleHash')
-                    
-                    if bundle_hash:
-                        logger.info(f"Bundle submitted successfully to block {target_block}")
-                        logger.info(f"Bundle Hash: {bundle_hash}")
-                        return {
-                            "bundle_hash": bundle_hash,
-                            "raw_result": result
-                        }
-                    else:
-                        logger.warning("No bundle hash returned")
-                        return None
+            session = await self._get_session()
+            async with session.post(
+                self.relay_url, 
+                data=request_body, 
+                headers=headers
+            ) as response:
+                response_text = await response.text()
+                logger.log(log_level, "Response status: %s", response.status)
+                logger.debug("Response body: %s", response_text)
+                
+                if response.status != 200:
+                    logger.error("Bundle submission failed with status %s", response.status)
+                    return None
+                
+                result = json_loads(response_text)
+                
+                # Extract bundle hash
+                bundle_hash = result.get('result', {}).get('bundleHash')
+                
+                if bundle_hash:
+                    logger.log(log_level, "Bundle submitted successfully to block %s", target_block)
+                    logger.log(log_level, "Bundle Hash: %s", bundle_hash)
+                    return {
+                        "bundle_hash": bundle_hash,
+                        "raw_result": result
+                    }
+                else:
+                    logger.warning("No bundle hash returned")
+                    return None
         
         except Exception as e:
-            logger.error(f"Bundle submission failed: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Bundle submission failed: %s", e)
             return None
 
-    async def check_flashbots_status(self, bundle_hash: str, target_block: Optional[int] = None) -> Dict[str, Any]:
+    def prepare_bundle_status_request(self, bundle_hash: str, target_block: int) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Build and sign a flashbots_getBundleStatsV2 request.
+        
+        The bundle hash and target block do not change while waiting for
+        inclusion, so the signed request can be built once and re-sent.
+        
+        Args:
+            bundle_hash: The hash of the bundle to check
+            target_block: The target block number
+        
+        Returns:
+            Tuple of (request body, request headers)
+        """
+        # Prepare params with required fields
+        params = [{
+            "bundleHash": bundle_hash,
+            "blockNumber": hex(target_block)
+        }]
+        
+        # Prepare bundle status request
+        status_request = {
+            "jsonrpc": "2.0",
+            "id": int(time.time() * 1000),
+            "method": "flashbots_getBundleStatsV2",
+            "params": params
+        }
+        
+        # Convert request to JSON
+        request_body = json_dumps_bytes(status_request)
+        
+        # Debug print request
+        logger.debug("V2 Bundle status request: %s", request_body)
+        
+        # Sign the request
+        signature = self._sign_flashbots_message(request_body)
+        
+        # The session already sends Content-Type, only the signature varies
+        headers = {'X-Flashbots-Signature': signature}
+        
+        return request_body, headers
+    
+    async def check_flashbots_status(
+        self, 
+        bundle_hash: str, 
+        target_block: Optional[int] = None,
+        prepared_request: Optional[Tuple[bytes, Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
         Check the status of a bundle submission with Flashbots using V2 API.
         
         Args:
             bundle_hash: The hash of the bundle to check
             target_block: The target block number (required for V2 API)
+            prepared_request: Request from prepare_bundle_status_request to re-send as is
             
         Returns:
             Bundle status information
         """
         try:
-            # V2 API requires blockNumber parameter
-            if target_block is None:
-                logger.error("Target block is required for flashbots_getBundleStatsV2")
-                return {"success": False, "error": "Target block is required"}
-            
-            # Prepare params with required fields
-            params = [{
-                "bundleHash": bundle_hash,
-                "blockNumber": hex(target_block)
-            }]
-            
-            # Prepare bundle status request
-            status_request = {
-                "jsonrpc": "2.0",
-                "id": int(time.time() * 1000),
-                "method": "flashbots_getBundleStatsV2",
-                "params": params
-            }
-            
-            # Convert request to JSON
-            request_json = json.dumps(status_request)
-            
-            # Debug print request
-            logger.info(f"V2 Bundle status request: {request_json}")
-            
-            # Sign the request
-            signature = self._sign_flashbots_message(request_json)
+            if prepared_request is None:
+                # V2 API requires blockNumber parameter
+                if target_block is None:
+                    logger.error("Target block is required for flashbots_getBundleStatsV2")
+                    return {"success": False, "error": "Target block is required"}
+                
+                prepared_request = self.prepare_bundle_status_request(bundle_hash, target_block)
             
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Flashbots-Signature': signature
-            }
+            request_body, headers = prepared_request
             
             # Send status request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.relay_url, 
-                    data=request_json, 
-                    headers=headers
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"Bundle V2 status response: {response_text}")
+            session = await self._get_session()
+            async with session.post(
+                self.relay_url, 
+                data=request_body, 
+                headers=headers
+            ) as response:
+                response_text = await response.text()
+                logger.debug("Bundle V2 status response: %s", response_text)
+                
+                if response.status != 200:
+                    logger.error("Bundle status check failed with status %s", response.status)
+                    return {"success": False, "error": response_text}
+                
+                result = json_loads(response_text)
+                
+                # Log meaningful information from the V2 response
+                if 'result' in result:
+                    status_result = result.get('result', {})
+                    logger.info("Bundle is %s", 'high priority' if status_result.get('isHighPriority') else 'standard priority')
+                    logger.info("Bundle has%sbeen simulated", ' ' if status_result.get('isSimulated') else ' not ')
                     
-                    if response.status != 200:
-                        logger.error(f"Bundle status check failed with status {response.status}")
-                        return {"success": False, "error": response_text}
+                    if status_result.get('receivedAt'):
+                        logger.info("Bundle was received at: %s", status_result.get('receivedAt'))
                     
-                    result = json.loads(response_text)
+                    if status_result.get('simulatedAt'):
+                        logger.info("Bundle was simulated at: %s", status_result.get('simulatedAt'))
                     
-                    # Log meaningful information from the V2 response
-                    if 'result' in result:
-                        status_result = result.get('result', {})
-                        logger.info(f"Bundle is {'high priority' if status_result.get('isHighPriority') else 'standard priority'}")
-                        logger.info(f"Bundle has{' ' if status_result.get('isSimulated') else ' not '}been simulated")
-                        
-                        if status_result.get('receivedAt'):
-                            logger.info(f"Bundle was received at: {status_result.get('receivedAt')}")
-                        
-                        if status_result.get('simulatedAt'):
-                            logger.info(f"Bundle was simulated at: {status_result.get('simulatedAt')}")
-                        
-                        builder_count = len(status_result.get('consideredByBuildersAt', []))
-                        if builder_count > 0:
-                            logger.info(f"Bundle was considered by {builder_count} builders")
-                        
-                        sealed_count = len(status_result.get('sealedByBuildersAt', []))
-                        if sealed_count > 0:
-                            logger.info(f"Bundle was sealed by {sealed_count} builders!")
-                        elif builder_count > 0 and sealed_count == 0:
-                            logger.warning("Bundle was considered but not sealed by any builders")
+                    builder_count = len(status_result.get('consideredByBuildersAt', []))
+                    if builder_count > 0:
+                        logger.info("Bundle was considered by %s builders", builder_count)
                     
-                    return result
+                    sealed_count = len(status_result.get('sealedByBuildersAt', []))
+                    if sealed_count > 0:
+                        logger.info("Bundle was sealed by %s builders!", sealed_count)
+                    elif builder_count > 0 and sealed_count == 0:
+                        logger.warning("Bundle was considered but not sealed by any builders")
+                
+                return result
         
         except Exception as e:
-            logger.error(f"Error checking bundle V2 status: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error checking bundle V2 status: %s", e)
             return {"success": False, "error": str(e)}
 
     async def check_user_stats(self, block_number: Optional[int] = None) -> Dict[str, Any]:
@@ -395,86 +749,68 @@ class FlashbotsManager:
         try:
             # Use current block if none provided
             if block_number is None:
-                block_number = self.w3.eth.block_number
-            
-            # Prepare params with required fields
-            params = [{
-                "blockNumber": hex(block_number)
-            }]
+                block_number = await asyncio.to_thread(lambda: self.w3.eth.block_number)
             
             # Prepare user stats request
-            stats_request = {
-                "jsonrpc": "2.0",
-                "id": int(time.time() * 1000),
-                "method": "flashbots_getUserStatsV2",
-                "params": params
-            }
+            stats_request = self._user_stats_request(block_number)
             
             # Convert request to JSON
-            request_json = json.dumps(stats_request)
+            request_body = json_dumps_bytes(stats_request)
             
             # Debug print request
-            logger.info(f"User stats request: {request_json}")
+            logger.debug("User stats request: %s", request_body)
             
             # Sign the request
-            signature = self._sign_flashbots_message(request_json)
+            signature = self._sign_flashbots_message(request_body)
             
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Flashbots-Signature': signature
-            }
+            # The session already sends Content-Type, only the signature varies
+            headers = {'X-Flashbots-Signature': signature}
             
             # Send stats request
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.relay_url, 
-                    data=request_json, 
-                    headers=headers
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"User stats response: {response_text}")
-                    
-                    if response.status != 200:
-                        logger.error(f"User stats check failed with status {response.status}")
-                        return {"success": False, "error": response_text}
-                    
-                    result = json.loads(response_text)
-                    
-                    # Log meaningful information from the response
-                    if 'result' in result:
-                        stats = result.get('result', {})
-                        is_high_priority = stats.get('isHighPriority', False)
-                        logger.info(f"User has {'HIGH' if is_high_priority else 'STANDARD'} priority status")
-                        
-                        # Format payments as ETH for better readability
-                        all_time_payments = stats.get('allTimeValidatorPayments', '0')
-                        all_time_eth = float(all_time_payments) / 1e18 if all_time_payments else 0
-                        logger.info(f"All-time validator payments: {all_time_eth:.4f} ETH")
-                        
-                        last_7d_payments = stats.get('last7dValidatorPayments', '0')
-                        last_7d_eth = float(last_7d_payments) / 1e18 if last_7d_payments else 0
-                        logger.info(f"Last 7 days validator payments: {last_7d_eth:.4f} ETH")
-                        
-                        # Log gas usage
-                        all_time_gas = stats.get('allTimeGasSimulated', '0')
-                        logger.info(f"All-time gas simulated: {all_time_gas}")
-                    
-                    return result
+            session = await self._get_session()
+            async with session.post(
+                self.relay_url, 
+                data=request_body, 
+                headers=headers
+            ) as response:
+                response_text = await response.text()
+                logger.debug("User stats response: %s", response_text)
+                
+                if response.status != 200:
+                    logger.error("User stats check failed with status %s", response.status)
+                    return {"success": False, "error": response_text}
+                
+                result = json_loads(response_text)
+                self._log_user_stats(result)
+                return result
         
         except Exception as e:
-            logger.error(f"Error checking user stats: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error checking user stats: %s", e)
             return {"success": False, "error": str(e)}
 
     async def check_transaction_status(self, tx_hash: str, network: str = "mainnet") -> Dict[str, Any]:
         """
         Check transaction status using web3.py.
         
+        The node lookups are synchronous, so they run in a worker thread and can
+        overlap with relay requests.
+        
         Args:
             tx_hash: Transaction hash to check
             network: Network to check on (not used with web3.py implementation)
             
+        Returns:
+            Transaction status information
+        """
+        return await asyncio.to_thread(self._transaction_status, tx_hash)
+    
+    def _transaction_status(self, tx_hash: str) -> Dict[str, Any]:
+        """
+        Look up a transaction's receipt, or its pending entry, on the node.
+        
+        Args:
+            tx_hash: Transaction hash to check
+            
         Returns:
             Transaction status information
         """
@@ -485,19 +821,19 @@ class FlashbotsManager:
                 if receipt:
                     # Transaction has been mined
                     success = receipt.status == 1
-                    logger.info(f"Transaction Status: {'SUCCESS' if success else 'FAILED'}")
+                    logger.info("Transaction Status: %s", 'SUCCESS' if success else 'FAILED')
                     
                     # Get the full transaction for more details
                     tx = self.w3.eth.get_transaction(tx_hash)
                     
                     # Log transaction details
-                    logger.info(f"From: {tx.get('from', 'N/A')}")
-                    logger.info(f"To: {tx.get('to', 'N/A')}")
-                    logger.info(f"Gas Limit: {tx.get('gas', 'N/A')}")
-                    logger.info(f"Max Fee: {tx.get('maxFeePerGas', 'N/A')}")
-                    logger.info(f"Priority Fee: {tx.get('maxPriorityFeePerGas', 'N/A')}")
-                    logger.info(f"Block Number: {receipt.blockNumber}")
-                    logger.info(f"Gas Used: {receipt.gasUsed}")
+                    logger.info("From: %s", tx.get('from', 'N/A'))
+                    logger.info("To: %s", tx.get('to', 'N/A'))
+                    logger.info("Gas Limit: %s", tx.get('gas', 'N/A'))
+                    logger.info("Max Fee: %s", tx.get('maxFeePerGas', 'N/A'))
+                    logger.info("Priority Fee: %s", tx.get('maxPriorityFeePerGas', 'N/A'))
+                    logger.info("Block Number: %s", receipt.blockNumber)
+                    logger.info("Gas Used: %s", receipt.gasUsed)
                     
                     return {
                         "success": True,
@@ -542,7 +878,7 @@ class FlashbotsManager:
                         }
                         
                 except Exception as e:
-                    logger.warning(f"Error checking pending transaction: {e}")
+                    logger.warning("Error checking pending transaction: %s", e)
                     return {
                         "success": False,
                         "status": "ERROR",
@@ -550,8 +886,7 @@ class FlashbotsManager:
                     }
             
         except Exception as e:
-            logger.error(f"Error checking transaction status: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error checking transaction status: %s", e)
             return {
                 "success": False,
                 "status": "ERROR",
@@ -566,13 +901,40 @@ class ZKarnage:
         w3: Web3, 
         account: Account, 
         relay_url: str, 
-        contract_address: Optional[Address] = None
+        contract_address: Optional[Address] = None,
+        session: Optional[requests.Session] = None,
+        ws_url: Optional[str] = None,
+        rpc_url: Optional[str] = None,
+        max_contracts: int = 100
     ):
         self.w3 = w3
         self.account = account
         self.contract_address = contract_address
+        # Raw JSON-RPC batches also run in worker threads, each with its own session
+        self._thread_local = threading.local()
+        self._thread_local.session = session or create_rpc_session()
+        self.ws_url = ws_url
+        self._ws_session: Optional[aiohttp.ClientSession] = None
+        # Raw JSON-RPC batches go over HTTP to the same node as w3
+        self.rpc_url = rpc_url or w3.provider.endpoint_uri
+        self.max_contracts = max_contracts
+        # Lowercased once for matching against receipt senders
+        self._account_address_lc = account.address.lower()
+        # Chain id never changes, so it is fetched with the first transaction context only
+        self._chain_id: Optional[int] = None
+        # (block number, response) of the last successful user stats lookup
+        self._user_stats_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        # The calldata only depends on the target list, so encode it once up front
+        self._attack_data, self._attack_target_count = self._build_attack_calldata()
+        self._attack_gas_limit = int(GAS_PER_CONTRACT * self._attack_target_count * GAS_LIMIT_BUFFER)
         self.flashbots = FlashbotsManager(w3, relay_url, account)
     
+    async def close(self):
+        """Release network resources held by the attack."""
+        if self._ws_session is not None and not self._ws_session.closed:
+            await self._ws_session.close()
+        await self.flashbots.close()
+    
     def get_next_hundred_block(self, current_block: Optional[int] = None) -> int:
         """
         Calculate the next block divisible by 100.
@@ -586,7 +948,239 @@ class ZKarnage:
         current = current_block or self.w3.eth.block_number
         return current + (100 - (current % 100))
     
-    async def check_bundle_status(self, bundle_hash: str, target_block: int, tx_hash: Optional[str] = None) -> bool:
+    async def _get_block_number(self) -> int:
+        """
+        Read the chain head without blocking the event loop.
+        
+        The web3 providers are synchronous, so the RPC runs in a worker thread
+        while the bundle resubmission and status tasks keep the loop.
+        
+        Returns:
+            Current block number
+        """
+        return await asyncio.to_thread(lambda: self.w3.eth.block_number)
+    
+    async def wait_for_block(self, target_block: int, log_progress: bool = False) -> int:
+        """
+        Wait until the chain head reaches the target block.
+        
+        Subscribes to newHeads over ETH_WS_URL when configured and polls the
+        block number otherwise, or once the subscription fails or goes quiet,
+        sleeping longer while the target is several
+        slots away and every BLOCK_POLL_INTERVAL seconds once it is next.
+        
+        Args:
+            target_block: Block number to wait for
+            log_progress: Whether to log each new block seen while waiting
+        
+        Returns:
+            Current block number, at or past the target block
+        """
+        current_block = await self._get_block_number()
+        if current_block >= target_block:
+            return current_block
+        
+        if self.ws_url:
+            try:
+                return await self._wait_for_block_ws(target_block, log_progress)
+            except Exception as e:
+                logger.warning("Websocket head subscription failed (%s), falling back to polling", e)
+        
+        last_logged_block = current_block
+        while current_block < target_block:
+            # Skip polls for blocks that cannot have arrived yet
+            eta = (target_block - current_block - 1) * SLOT_TIME
+            await asyncio.sleep(min(max(BLOCK_POLL_INTERVAL, eta), BLOCK_POLL_MAX_INTERVAL))
+            current_block = await self._get_block_number()
+            
+            # Only log when block number changes
+            if log_progress and last_logged_block < current_block < target_block:
+                logger.info("Waiting for block %s, current block is %s", target_block, current_block)
+                last_logged_block = current_block
+        return current_block
+    
+    def _get_ws_session(self) -> aiohttp.ClientSession:
+        """
+        Return the session used for websocket connections, creating it on first use.
+        
+        Returns:
+            Session reused by every newHeads wait
+        """
+        if self._ws_session is None or self._ws_session.closed:
+            self._ws_session = aiohttp.ClientSession()
+        return self._ws_session
+    
+    async def check_ws_endpoint(self) -> int:
+        """
+        Check that the websocket endpoint answers JSON-RPC before relying on it.
+        
+        Returns:
+            Block number reported over the websocket
+        
+        Raises:
+            ZKarnageError: If the websocket cannot be opened or does not answer eth_blockNumber
+        """
+        async def request_block_number() -> aiohttp.WSMessage:
+            async with self._get_ws_session().ws_connect(self.ws_url) as ws:
+                await ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []})
+                return await ws.receive()
+        
+        try:
+            msg = await asyncio.wait_for(request_block_number(), RPC_TIMEOUT)
+        except Exception as e:
+            raise ZKarnageError(f"Cannot connect to websocket endpoint {self.ws_url}: {e or type(e).__name__}") from e
+        
+        payload = json_loads(msg.data) if msg.type == aiohttp.WSMsgType.TEXT else {}
+        if "result" not in payload:
+            raise ZKarnageError(f"Websocket endpoint {self.ws_url} did not answer eth_blockNumber: {msg.data}")
+        return int(payload["result"], 16)
+    
+    async def _wait_for_block_ws(self, target_block: int, log_progress: bool = False) -> int:
+        """
+        Wait for the target block using an eth_subscribe("newHeads") websocket.
+        
+        Args:
+            target_block: Block number to wait for
+            log_progress: Whether to log each new head seen while waiting
+        
+        Returns:
+            Number of the first new head at or past the target block
+        
+        Raises:
+            ConnectionError: If the websocket closes or stays silent for WS_HEAD_TIMEOUT seconds
+        """
+        session = self._get_ws_session()
+        async with session.ws_connect(self.ws_url) as ws:
+            await ws.send_json({
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "eth_subscribe",
+                "params": ["newHeads"]
+            })
+            
+            while True:
+                try:
+                    msg = await asyncio.wait_for(ws.receive(), WS_HEAD_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise ConnectionError(f"No newHeads message for {WS_HEAD_TIMEOUT}s") from None
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                
+                payload = json_loads(msg.data)
+                if "error" in payload:
+                    raise ZKarnageError(f"eth_subscribe failed: {payload['error']}")
+                
+                # The head was read before subscribing, so a block mined in between
+                # would never be announced; re-read it once the subscription is live
+                if payload.get("id") == 1:
+                    current_block = await self._get_block_number()
+                    if current_block >= target_block:
+                        return current_block
+                    continue
+                
+                head = payload.get("params", {}).get("result", {})
+                if "number" not in head:
+                    continue
+                
+                current_block = int(head["number"], 16)
+                if current_block >= target_block:
+                    return current_block
+                if log_progress:
+                    logger.info("Waiting for block %s, current block is %s", target_block, current_block)
+        
+        raise ConnectionError("Websocket closed before the target block was reached")
+    
+    def _get_block_receipts(self, block_number: int) -> List[Dict[str, Any]]:
+        """
+        Fetch all receipts of a block with a single eth_getBlockReceipts call.
+        
+        Falls back to eth_getTransactionReceipt for every transaction, sent as
+        one batched request, on nodes without eth_getBlockReceipts.
+        
+        Args:
+            block_number: Block to fetch receipts for
+        
+        Returns:
+            Raw receipts with hex-encoded transactionHash, from and status fields
+        """
+        # web3.py v6 has no eth_getBlockReceipts wrapper, so go through the provider
+        response = self.w3.provider.make_request("eth_getBlockReceipts", [hex(block_number)])
+        if response.get('result') is not None:
+            return response['result']
+        
+        logger.warning("eth_getBlockReceipts unavailable (%s), fetching receipts individually", response.get('error'))
+        tx_hashes = [self.w3.to_hex(raw_hash) for raw_hash in self.w3.eth.get_block(block_number).transactions]
+        try:
+            results = self._rpc_batch([("eth_getTransactionReceipt", [h]) for h in tx_hashes])
+            return [receipt for receipt in results if receipt is not None]
+        except Exception as e:
+            logger.warning("Batched receipt fetch failed (%s), fetching receipts one by one", e)
+        
+        receipts = []
+        for tx_hash_current in tx_hashes:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash_current)
+                receipts.append({
+                    'transactionHash': tx_hash_current,
+                    'from': receipt.get('from', ''),
+                    'status': hex(receipt.status)
+                })
+            except Exception as e:
+                logger.warning("Error checking receipt for tx %s: %s", tx_hash_current, e)
+        return receipts
+    
+    async def _monitor_bundle_status(self, bundle_hash: str, target_block: int) -> None:
+        """
+        Log the bundle's Flashbots status every 15 seconds until cancelled.
+        
+        Args:
+            bundle_hash: The hash of the bundle to check
+            target_block: The target block number
+        """
+        # The signed request is the same on every tick, so build it once
+        status_request = self.flashbots.prepare_bundle_status_request(bundle_hash, target_block)
+        
+        while True:
+            logger.info("Checking current bundle status while waiting...")
+            
+            # Use the V2 API for more detailed status
+            status = await self.flashbots.check_flashbots_status(
+                bundle_hash, target_block, prepared_request=status_request
+            )
+            
+            if 'result' in status:
+                status_result = status.get('result', {})
+                
+                # Check for builder consideration
+                builders = status_result.get('consideredByBuildersAt', [])
+                seals = status_result.get('sealedByBuildersAt', [])
+                
+                if seals:
+                    logger.info("EXCELLENT! Bundle has been sealed by %s builders", len(seals))
+                    for sealed in seals:
+                        logger.info("  - Sealed by: %s... at %s", sealed.get('pubkey')[:16], sealed.get('timestamp'))
+                elif builders:
+                    logger.info("Bundle is being considered by %s builders", len(builders))
+                else:
+                    # If no builders are considering it, analyze why
+                    if status_result.get('isHighPriority', False):
+                        logger.info("Bundle is high priority but not yet considered by builders")
+                
+                # Check simulation status
+                if status_result.get('isSimulated', False):
+                    logger.info("Bundle was simulated at: %s", status_result.get('simulatedAt'))
+                else:
+                    logger.warning("Bundle has not been simulated yet")
+            
+            await asyncio.sleep(15)
+    
+    async def check_bundle_status(
+        self,
+        bundle_hash: str,
+        target_block: int,
+        tx_hash: Optional[str] = None,
+        target_reached: Optional[asyncio.Event] = None
+    ) -> bool:
         """
         Check if a bundle was included using Flashbots API.
         
@@ -594,127 +1188,106 @@ class ZKarnage:
             bundle_hash: The hash of the bundle to check
             target_block: The target block number
             tx_hash: Optional transaction hash to check individual tx status
+            target_reached: Optional event set once the target block is reached
             
         Returns:
             Whether the bundle was included
         """
         try:
             # Wait until we've reached the target block
-            current_block = self.w3.eth.block_number
+            current_block = await self._get_block_number()
             if current_block < target_block:
-                logger.info(f"Waiting for target block {target_block}, current block is {current_block}")
-                
-                last_logged_block = current_block
-                last_status_check = 0
-                while current_block < target_block:
-                    # Check bundle status every 15 seconds while waiting
-                    if time.time() - last_status_check > 15:
-                        logger.info(f"Checking current bundle status while waiting...")
-                        
-                        # Use the V2 API for more detailed status
-                        status = await self.flashbots.check_flashbots_status(bundle_hash, target_block)
-                        
-                        if 'result' in status:
-                            status_result = status.get('result', {})
-                            
-                            # Check for builder consideration
-                            builders = status_result.get('consideredByBuildersAt', [])
-                            seals = status_result.get('sealedByBuildersAt', [])
-                            
-                            if seals:
-                                logger.info(f"EXCELLENT! Bundle has been sealed by {len(seals)} builders")
-                                for sealed in seals:
-                                    logger.info(f"  - Sealed by: {sealed.get('pubkey')[:16]}... at {sealed.get('timestamp')}")
-                            elif builders:
-                                logger.info(f"Bundle is being considered by {len(builders)} builders")
-                            else:
-                                # If no builders are considering it, analyze why
-                                if status_result.get('isHighPriority', False):
-                                    logger.info("Bundle is high priority but not yet considered by builders")
-                            
-                            # Check simulation status
-                            if status_result.get('isSimulated', False):
-                                logger.info(f"Bundle was simulated at: {status_result.get('simulatedAt')}")
-                            else:
-                                logger.warning("Bundle has not been simulated yet")
-                        
-                        last_status_check = time.time()
+                logger.info("Waiting for target block %s, current block is %s", target_block, current_block)
                 
-                    await asyncio.sleep(5)  # Check every 5 seconds
-                    current_block = self.w3.eth.block_number
-                    
-                    # Only log when block number changes
-                    if current_block > last_logged_block:
-                        logger.info(f"Waiting for block {target_block}, current block is {current_block}")
-                        last_logged_block = current_block
+                # Report bundle status on its own schedule so it never delays the head stream
+                status_task = asyncio.create_task(self._monitor_bundle_status(bundle_hash, target_block))
+                # wait_for_block re-reads the head once newHeads is subscribed and drops
+                # to polling when the websocket goes quiet; the deadline covers the rest
+                deadline = (target_block - current_block + 2) * SLOT_TIME
+                try:
+                    await asyncio.wait_for(self.wait_for_block(target_block, log_progress=True), deadline)
+                except asyncio.TimeoutError:
+                    current_block = await self._get_block_number()
+                    if current_block < target_block:
+                        logger.warning("Target block %s not reached after %ss, current block is %s", target_block, deadline, current_block)
+                        return False
+                finally:
+                    status_task.cancel()
                 
-                logger.info(f"Target block {target_block} reached")
+                logger.info("Target block %s reached", target_block)
             
-            # Now that we've reached the target block, check for our transaction
-            logger.info(f"Checking block {target_block} for bundle inclusion")
+            if target_reached is not None:
+                target_reached.set()
             
-            # Get the block and check for our transaction
-            block = self.w3.eth.get_block(target_block, full_transactions=True)
-            tx_count = len(block.transactions)
-            logger.info(f"Block contains {tx_count} transactions")
+            # Now that we've reached the target block, check for our transaction
+            logger.info("Checking block %s for bundle inclusion", target_block)
             
-            # Check for our transaction in the block
-            for tx in block.transactions:
-                # Try to match our bundle hash or tx hash
-                tx_hash_current = self.w3.to_hex(tx.hash) if hasattr(tx, 'hash') else tx
-                
-                # If we have a tx_hash to match against, use it
-                if tx_hash and tx_hash_current.lower() == tx_hash.lower():
-                    logger.info(f"Found our transaction in the block: {tx_hash}")
-                    return True
-                
-                # Get receipt to check status
+            if tx_hash:
+                # With a known hash, its receipt alone tells us whether it landed in the target block
                 try:
-                    receipt = self.w3.eth.get_transaction_receipt(tx_hash_current)
-                    if receipt:
-                        # Check if this transaction is from our account
-                        if receipt.get('from', '').lower() == self.account.address.lower():
-                            logger.info(f"Found our transaction: {tx_hash_current}")
-                            logger.info(f"Transaction status: {'Success' if receipt.status == 1 else 'Failed'}")
-                            return receipt.status == 1
-                except Exception as e:
-                    logger.warning(f"Error checking receipt for tx {tx_hash_current}: {e}")
-            
-            # Now that target block has passed, check transaction status using the API
+                    receipt = await asyncio.to_thread(self.w3.eth.get_transaction_receipt, HexBytes(tx_hash))
+                    if receipt.blockNumber == target_block:
+                        logger.info("Found our transaction in the block: %s", tx_hash)
+                        return True
+                    logger.info("Transaction %s was mined in block %s, not %s", tx_hash, receipt.blockNumber, target_block)
+                except TransactionNotFound:
+                    logger.info("Transaction %s not found in block %s", tx_hash, target_block)
+            else:
+                # Otherwise scan every receipt in the block for one sent from our account
+                receipts = await asyncio.to_thread(self._get_block_receipts, target_block)
+                logger.info("Block contains %s transactions", len(receipts))
+                
+                for receipt in receipts:
+                    if receipt.get('from', '').lower() == self._account_address_lc:
+                        success = int(receipt.get('status', '0x0'), 16) == 1
+                        logger.info("Found our transaction: %s", receipt.get('transactionHash'))
+                        logger.info("Transaction status: %s", 'Success' if success else 'Failed')
+                        return success
+            
+            # Now that target block has passed, check transaction status using the API,
+            # together with one final check of the V2 bundle status; the two are independent
             if tx_hash:
-                logger.info(f"Checking individual transaction status via Flashbots API after target block...")
-                final_tx_status = await self.flashbots.check_transaction_status(tx_hash)
+                logger.info("Checking individual transaction status via Flashbots API after target block...")
+                final_tx_status, final_status = await asyncio.gather(
+                    self.flashbots.check_transaction_status(tx_hash),
+                    self.flashbots.check_flashbots_status(bundle_hash, target_block)
+                )
                 
                 status = final_tx_status.get("status", "UNKNOWN")
-                logger.info(f"Transaction Status: {status}")
+                logger.info("Transaction Status: %s", status)
                 
                 if status == "INCLUDED":
-                    logger.info(f"Transaction {tx_hash} was confirmed as included via Transaction Status API")
+                    logger.info("Transaction %s was confirmed as included via Transaction Status API", tx_hash)
                     return True
-            
-            # Do one final check with the V2 API to confirm status
-            final_status = await self.flashbots.check_flashbots_status(bundle_hash, target_block)
+            else:
+                final_status = await self.flashbots.check_flashbots_status(bundle_hash, target_block)
             
             if 'result' in final_status:
                 status_result = final_status.get('result', {})
                 seals = status_result.get('sealedByBuildersAt', [])
                 
                 if seals:
-                    logger.warning(f"Bundle was sealed by {len(seals)} builders but not found in block {target_block}")
+                    logger.warning("Bundle was sealed by %s builders but not found in block %s", len(seals), target_block)
                     logger.warning("This is unusual and may indicate the bundle was outbid or the block producer chose a different bundle")
                 else:
-                    logger.warning(f"Bundle with hash {bundle_hash} was not sealed by any builders")
+                    logger.warning("Bundle with hash %s was not sealed by any builders", bundle_hash)
                     logger.warning("The bundle was likely not competitive enough for inclusion")
             
-            logger.warning(f"Bundle with hash {bundle_hash} not found in block {target_block}")
+            logger.warning("Bundle with hash %s not found in block %s", bundle_hash, target_block)
             return False
             
         except Exception as e:
-            logger.error(f"Error checking bundle status: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error checking bundle status: %s", e)
             return False
 
-    async def execute_attack(self, target_hundred: bool = True, fast_mode: bool = False, flashbots_mode: bool = False) -> bool:
+    async def execute_attack(
+        self, 
+        target_hundred: bool = True, 
+        fast_mode: bool = False, 
+        flashbots_mode: bool = False,
+        retry_count: int = 0,
+        current_block: Optional[int] = None
+    ) -> bool:
         """
         Execute ZKarnage attack.
         
@@ -722,6 +1295,8 @@ class ZKarnage:
             target_hundred: Whether to target block divisible by 100
             fast_mode: If True, target a block just 2 blocks ahead instead of waiting for hundred-block
             flashbots_mode: If True, submit Flashbots bundle instead of direct transaction
+            retry_count: Number of previous failed attempts, used to bump the priority fee
+            current_block: Recent block number the caller already has; fetched when omitted
         
         Returns:
             Whether attack was successful
@@ -732,72 +1307,60 @@ class ZKarnage:
                 raise ZKarnageError("No contract address specified")
             
             # Determine target block
-            current_block = self.w3.eth.block_number
+            if current_block is None:
+                current_block = await self._get_block_number()
             if fast_mode:
                 target_block = current_block + 2  # Target just 2 blocks ahead for quick testing
                 logger.info("FAST MODE: Targeting block 2 blocks ahead")
             else:
                 target_block = self.get_next_hundred_block(current_block) if target_hundred else current_block + 1
             
+            # Fee and nonce state fetched far ahead would be stale by submission time
+            if not fast_mode and target_block - current_block > PREPARE_LEAD_BLOCKS:
+                logger.info("Target block %s is %s blocks away, waiting for block %s before preparing",
+                            target_block, target_block - current_block, target_block - PREPARE_LEAD_BLOCKS)
+                await self.wait_for_block(target_block - PREPARE_LEAD_BLOCKS)
+            
+            # Fetch fee, nonce and the head block in one batch, as close to the target as possible
+            context = await asyncio.to_thread(self._fetch_transaction_context)
+            current_block = context[0]
+            
             # Log attack details
-            logger.info(f"Preparing ZKarnage attack")
-            logger.info(f"Current block: {current_block}")
-            logger.info(f"Target block: {target_block}")
-            
-            # Check user stats to determine if we need higher fees only if in Flashbots mode
-            is_high_priority = False
-            if flashbots_mode:
-                logger.info("Checking Flashbots user stats and reputation...")
-                user_stats = await self.flashbots.check_user_stats(current_block)
-                
-                if 'result' in user_stats:
-                    is_high_priority = user_stats.get('result', {}).get('isHighPriority', False)
-                    
-                    if not is_high_priority:
-                        logger.warning("Account does not have high priority status with Flashbots")
-                        logger.warning("Bundles may need higher priority fees to be competitive")
-                    else:
-                        logger.info("Account has HIGH PRIORITY status with Flashbots - bundles will be prioritized")
+            logger.info("Preparing ZKarnage attack")
+            logger.info("Current block: %s", current_block)
+            logger.info("Target block: %s", target_block)
             
-            # Prepare transaction with priority fee adjusted based on reputation
-            tx = self._prepare_attack_transaction(target_block, is_high_priority)
-            signed_tx = self.w3.eth.account.sign_transaction(tx, self.account.key)
+            # Prepare transaction; reputation no longer affects fees, so the user
+            # stats check is batched with the bundle simulation below
+            tx = self._prepare_attack_transaction(target_block, False, retry_count, context)
+            # Signing is a few milliseconds of secp256k1 work; keep it off the event loop
+            signed_tx = await asyncio.to_thread(self.account.sign_transaction, tx)
             
             # Extract transaction hash for later status checks
             tx_hash = signed_tx.hash.hex()
-            logger.info(f"Transaction hash: {tx_hash}")
+            logger.info("Transaction hash: %s", tx_hash)
             
             # Wait until we're 4 blocks away from target
-            last_logged_block = current_block
-            while True:
-                current_block = self.w3.eth.block_number
-                blocks_remaining = target_block - current_block
-                
-                if blocks_remaining <= 4:
-                    logger.info(f"Within 4 blocks of target (current: {current_block}, target: {target_block})")
-                    break
-                
-                # Only log if block number changed and it's a multiple of 10 blocks remaining
-                if current_block > last_logged_block and blocks_remaining % 10 == 0:
-                    logger.info(f"Waiting for block {current_block + (blocks_remaining - 4)} to submit bundle (current: {current_block}, target: {target_block})")
-                    last_logged_block = current_block
-                
-                await asyncio.sleep(2)  # Check every 2 seconds
+            if target_block - current_block > 4:
+                logger.info("Waiting for block %s to submit bundle (current: %s, target: %s)", target_block - 4, current_block, target_block)
+            current_block = await self.wait_for_block(target_block - 4)
+            logger.info("Within 4 blocks of target (current: %s, target: %s)", current_block, target_block)
             
             if not flashbots_mode:
                 # Wait until 1 block before target
-                while current_block < target_block - 1:
-                    current_block = self.w3.eth.block_number
-                    await asyncio.sleep(1)
+                current_block = await self.wait_for_block(target_block - 1)
                 
                 # Submit direct transaction
                 logger.info("Submitting direct transaction...")
-                tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-                logger.info(f"Transaction submitted with hash: {tx_hash.hex()}")
+                tx_hash = await asyncio.to_thread(self.w3.eth.send_raw_transaction, signed_tx.rawTransaction)
+                logger.info("Transaction submitted with hash: %s", tx_hash.hex())
                 
-                # Wait for transaction to be mined
+                # Wait for transaction to be mined, polling once per BLOCK_POLL_INTERVAL
                 logger.info("Waiting for transaction to be mined...")
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)  # 5 minute timeout
+                receipt = await asyncio.to_thread(
+                    self.w3.eth.wait_for_transaction_receipt,
+                    tx_hash, timeout=300, poll_latency=BLOCK_POLL_INTERVAL  # 5 minute timeout
+                )
                 
                 if receipt and receipt.status == 1:
                     logger.info("Transaction successfully mined!")
@@ -806,22 +1369,38 @@ class ZKarnage:
                     logger.error("Transaction failed or timed out")
                     return False
             
-            # Simulate bundle
-            logger.info("Simulating bundle...")
-            sim_result = await self.flashbots.simulate_bundle(
-                [signed_tx.rawTransaction], 
-                target_block
-            )
+            if self._user_stats_cache and current_block - self._user_stats_cache[0] < USER_STATS_CACHE_BLOCKS:
+                # Reuse the recent user stats and only simulate the bundle
+                logger.info("Simulating bundle (reusing cached Flashbots user stats)...")
+                user_stats = self._user_stats_cache[1]
+                sim_result = await self.flashbots.simulate_bundle([signed_tx.rawTransaction], target_block)
+            else:
+                # Simulate bundle and check user stats and reputation in one relay round-trip
+                logger.info("Simulating bundle and checking Flashbots user stats...")
+                sim_result, user_stats = await self.flashbots.simulate_bundle_with_user_stats(
+                    [signed_tx.rawTransaction], 
+                    target_block,
+                    current_block
+                )
+                if 'result' in user_stats:
+                    self._user_stats_cache = (current_block, user_stats)
+            
+            if 'result' in user_stats:
+                if not user_stats.get('result', {}).get('isHighPriority', False):
+                    logger.warning("Account does not have high priority status with Flashbots")
+                    logger.warning("Bundles may need higher priority fees to be competitive")
+                else:
+                    logger.info("Account has HIGH PRIORITY status with Flashbots - bundles will be prioritized")
             
             # Check for transaction revert in simulation results
             if sim_result.get('raw_result', {}).get('result', {}).get('results', []):
                 tx_results = sim_result.get('raw_result', {}).get('result', {}).get('results', [])
                 for i, tx_result in enumerate(tx_results):
                     if tx_result.get('error'):
-                        logger.error(f"Transaction {i} failed with error: {tx_result.get('error')}")
+                        logger.error("Transaction %s failed with error: %s", i, tx_result.get('error'))
                         # If there's a revert reason, try to decode it
                         if 'revert' in tx_result.get('error', '') and tx_result.get('revert'):
-                            logger.error(f"Revert reason: {tx_result.get('revert')}")
+                            logger.error("Revert reason: %s", tx_result.get('revert'))
             
             # Check simulation result in detail
             if not sim_result.get('success', False):
@@ -829,7 +1408,7 @@ class ZKarnage:
                 
                 # Log detailed simulation error
                 if 'error' in sim_result:
-                    logger.error(f"Simulation error: {sim_result['error']}")
+                    logger.error("Simulation error: %s", sim_result['error'])
                 
                 # Provide additional helpful information
                 logger.error("Possible issues:")
@@ -845,15 +1424,18 @@ class ZKarnage:
             
             # Log simulation details
             sim_details = sim_result.get('details', {})
-            logger.info(f"Simulation successful")
-            logger.info(f"Total gas used: {sim_details.get('totalGasUsed', 'N/A')}")
-            logger.info(f"Coinbase difference: {sim_details.get('coinbaseDiff', 'N/A')}")
+            logger.info("Simulation successful")
+            logger.info("Total gas used: %s", sim_details.get('totalGasUsed', 'N/A'))
+            logger.info("Coinbase difference: %s", sim_details.get('coinbaseDiff', 'N/A'))
             
             # Submit bundle
             logger.info("Submitting bundle to Flashbots...")
+            bundle = [signed_tx.rawTransaction]
+            replacement_uuid = str(uuid.uuid4())
             bundle_submission = await self.flashbots.submit_bundle(
-                [signed_tx.rawTransaction], 
-                target_block
+                bundle, 
+                target_block,
+                replacement_uuid=replacement_uuid
             )
             
             # Check bundle submission
@@ -863,95 +1445,251 @@ class ZKarnage:
             
             # Log bundle submission details
             bundle_hash = bundle_submission.get('bundle_hash', 'N/A')
-            logger.info(f"Bundle submitted successfully")
-            logger.info(f"Bundle Hash: {bundle_hash}")
-            
-            # Check transaction status using the transaction status API
-            logger.info(f"Checking individual transaction status via Flashbots API...")
-            tx_status = await self.flashbots.check_transaction_status(tx_hash)
-            logger.info(f"Transaction status API response: {json.dumps(tx_status, indent=2)}")
-            
-            # Check bundle status with Flashbots V2 API
-            logger.info(f"Checking bundle status with Flashbots V2 API...")
-            status = await self.flashbots.check_flashbots_status(bundle_hash, target_block)
-            
-            # Process the V2 API response
-            if 'result' in status:
-                status_result = status.get('result', {})
-                logger.info(f"Bundle Status V2: {json.dumps(status_result, indent=2)}")
+            logger.info("Bundle submitted successfully")
+            logger.info("Bundle Hash: %s", bundle_hash)
+            
+            # Post-submission diagnostics cost two relay round-trips; only run them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                # Check transaction status and bundle status (V2 API) concurrently
+                logger.info("Checking transaction status and bundle status via Flashbots APIs...")
+                tx_status, status = await asyncio.gather(
+                    self.flashbots.check_transaction_status(tx_hash),
+                    self.flashbots.check_flashbots_status(bundle_hash, target_block)
+                )
+                logger.info("Transaction status API response: %s", json_dumps(tx_status, pretty=True))
                 
-                # Display key bundle metrics
-                is_high_priority = status_result.get('isHighPriority', False)
-                is_simulated = status_result.get('isSimulated', False)
-                
-                logger.info(f"Bundle priority: {'HIGH' if is_high_priority else 'STANDARD'}")
-                logger.info(f"Bundle simulation: {'COMPLETED' if is_simulated else 'PENDING'}")
-                
-                # Check if any builders are considering the bundle
-                builders_considering = status_result.get('consideredByBuildersAt', [])
-                if builders_considering:
-                    logger.info(f"Bundle is being considered by {len(builders_considering)} builders")
+                # Process the V2 API response
+                if 'result' in status:
+                    status_result = status.get('result', {})
+                    logger.info("Bundle Status V2: %s", json_dumps(status_result, pretty=True))
+                    
+                    # Display key bundle metrics
+                    is_high_priority = status_result.get('isHighPriority', False)
+                    is_simulated = status_result.get('isSimulated', False)
+                    
+                    logger.info("Bundle priority: %s", 'HIGH' if is_high_priority else 'STANDARD')
+                    logger.info("Bundle simulation: %s", 'COMPLETED' if is_simulated else 'PENDING')
+                    
+                    # Check if any builders are considering the bundle
+                    builders_considering = status_result.get('consideredByBuildersAt', [])
+                    if builders_considering:
+                        logger.info("Bundle is being considered by %s builders", len(builders_considering))
+                    else:
+                        logger.warning("Bundle is not being considered by any builders")
+                    
+                    # Check if any builders have sealed the bundle
+                    builders_sealed = status_result.get('sealedByBuildersAt', [])
+                    if builders_sealed:
+                        logger.info("GREAT NEWS! Bundle has been sealed by %s builders", len(builders_sealed))
+                        for sealed in builders_sealed:
+                            logger.info("  - Sealed by: %s... at %s", sealed.get('pubkey')[:16], sealed.get('timestamp'))
                 else:
-                    logger.warning(f"Bundle is not being considered by any builders")
-                
-                # Check if any builders have sealed the bundle
-                builders_sealed = status_result.get('sealedByBuildersAt', [])
-                if builders_sealed:
-                    logger.info(f"GREAT NEWS! Bundle has been sealed by {len(builders_sealed)} builders")
-                    for sealed in builders_sealed:
-                        logger.info(f"  - Sealed by: {sealed.get('pubkey')[:16]}... at {sealed.get('timestamp')}")
-            else:
-                logger.warning(f"No status result available for bundle {bundle_hash}")
+                    logger.warning("No status result available for bundle %s", bundle_hash)
+            
+            # Keep re-sending the bundle in the background while we wait for the target block
+            target_reached = asyncio.Event()
+            resubmit_task = asyncio.create_task(
+                self._resubmit_bundle(bundle, target_block, replacement_uuid, tx_hash, target_reached)
+            )
             
             # Wait for the target block and check bundle inclusion
-            logger.info(f"Waiting for target block {target_block} to check bundle inclusion")
-            bundle_included = await self.check_bundle_status(bundle_hash, target_block, tx_hash)
+            logger.info("Waiting for target block %s to check bundle inclusion", target_block)
+            try:
+                bundle_included = await self.check_bundle_status(bundle_hash, target_block, tx_hash, target_reached)
+            finally:
+                resubmit_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await resubmit_task
             
             if bundle_included:
-                logger.info(f"Bundle successfully included in block {target_block}")
+                logger.info("Bundle successfully included in block %s", target_block)
                 return True
             else:
-                logger.warning(f"Bundle not included in target block {target_block}")
+                logger.warning("Bundle not included in target block %s", target_block)
                 return False
             
         except Exception as e:
-            logger.error(f"Attack execution failed: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Attack execution failed: %s", e)
             return False
     
-    def _prepare_attack_transaction(self, target_block: int, is_high_priority: bool) -> Dict[str, Any]:
+    async def _resubmit_bundle(
+        self,
+        bundle: List[bytes],
+        target_block: int,
+        replacement_uuid: str,
+        tx_hash: str,
+        stop: asyncio.Event
+    ) -> None:
         """
-        Prepare attack transaction.
+        Re-send a submitted bundle with a growing delay until the target block is mined.
+        
+        Relay and builder views drift between snapshots, so repeated submissions
+        under the same replacement UUID raise the chance a builder sees the bundle.
         
         Args:
-            target_block: Block number to target
-            is_high_priority: Whether the account has high priority status (no longer used)
+            bundle: List of signed transaction bytes
+            target_block: Block number the bundle targets
+            replacement_uuid: Replacement UUID of the original submission
+            tx_hash: Hash of the bundled transaction, checked for inclusion
+            stop: Set by check_bundle_status once the target block is reached
+        """
+        last_check = time.monotonic()
+        for attempt in range(1, BUNDLE_RESUBMIT_ATTEMPTS + 1):
+            try:
+                await asyncio.wait_for(stop.wait(), BUNDLE_RESUBMIT_DELAY * attempt)
+                return
+            except asyncio.TimeoutError:
+                pass
+            
+            # Blocks arrive once per slot, so there is no point asking the node more often
+            if time.monotonic() - last_check >= SLOT_TIME:
+                last_check = time.monotonic()
+                try:
+                    if await self._get_block_number() >= target_block or await self._is_mined(tx_hash):
+                        return
+                except Exception as e:
+                    logger.debug("Resubmission head check failed: %s", e)
+            
+            await self.flashbots.submit_bundle(
+                bundle, target_block, replacement_uuid=replacement_uuid, resubmission=True
+            )
+    
+    async def _is_mined(self, tx_hash: str) -> bool:
+        """
+        Check whether a transaction has a receipt, without blocking the event loop.
+        
+        Args:
+            tx_hash: Transaction hash to look up
         
         Returns:
-            Transaction dictionary
+            Whether the transaction has been mined
         """
-        # Get latest block for base fee estimation
-        latest = self.w3.eth.get_block("latest")
-        base_fee = latest.get("baseFeePerGas", self.w3.eth.gas_price)
+        try:
+            await asyncio.to_thread(self.w3.eth.get_transaction_receipt, HexBytes(tx_hash))
+            return True
+        except TransactionNotFound:
+            return False
+    
+    def _get_rpc_session(self) -> requests.Session:
+        """
+        Return the calling thread's RPC session, creating it on first use.
         
-        # ABI for executing attack (simplified)
-        attack_abi = {
-            "inputs": [{"name": "targets", "type": "address[]"}],
-            "name": "executeAttack",
-            "type": "function"
-        }
+        Returns:
+            Session owned by the current thread
+        """
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = self._thread_local.session = create_rpc_session()
+        return session
+    
+    def _rpc_batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Send JSON-RPC calls to the node as a single batched HTTP POST.
+        
+        Args:
+            calls: List of (method, params) tuples
+        
+        Returns:
+            Results in call order
+        
+        Raises:
+            ValueError: If the provider rejects the batch (e.g. -32003 batch limits)
+                or any call in it fails
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        response = self._get_rpc_session().post(self.rpc_url, json=payload, timeout=RPC_TIMEOUT)
+        response.raise_for_status()
+        results = json_loads(response.content)
+        
+        # Providers without batch support answer with a single error object
+        if not isinstance(results, list):
+            raise ValueError(f"Batch request rejected: {results.get('error')}")
+        
+        by_id = {result.get("id"): result for result in results}
+        if any("result" not in by_id.get(i, {}) for i in range(len(calls))):
+            raise ValueError(f"Incomplete batch response: {results}")
+        
+        return [by_id[i]["result"] for i in range(len(calls))]
+    
+    def check_contract_deployed(self) -> int:
+        """
+        Check that the contract has code, fetching the block number in the same round-trip.
+        
+        Returns:
+            Current block number
+        """
+        try:
+            code, block_number = self._rpc_batch([
+                ("eth_getCode", [self.contract_address, "latest"]),
+                ("eth_blockNumber", []),
+            ])
+            block_number = int(block_number, 16)
+        except Exception as e:
+            logger.debug("Batch RPC request failed (%s), falling back to sequential calls", e)
+            code = self.w3.to_hex(self.w3.eth.get_code(self.contract_address))
+            block_number = self.w3.eth.block_number
+        
+        if code in ("0x", "0x0"):
+            logger.warning("No contract code found at %s", self.contract_address)
+        
+        return block_number
+    
+    def _fetch_transaction_context(self) -> Tuple[int, int, int, int]:
+        """
+        Fetch the latest block number, base fee, nonce and chain id in a single JSON-RPC batch.
         
+        The chain id is only requested on the first call and cached afterwards.
+        Falls back to sequential calls if the provider rejects batches.
+        
+        Returns:
+            Tuple of (block_number, base_fee, nonce, chain_id)
+        """
+        calls = [
+            ("eth_getBlockByNumber", ["latest", False]),
+            ("eth_getTransactionCount", [self.account.address, "latest"]),
+        ]
+        if self._chain_id is None:
+            calls.append(("eth_chainId", []))
+        
+        try:
+            results = self._rpc_batch(calls)
+            latest, nonce = results[0], int(results[1], 16)
+            block_number = int(latest["number"], 16)
+            base_fee = int(latest["baseFeePerGas"], 16) if latest.get("baseFeePerGas") else self.w3.eth.gas_price
+            if self._chain_id is None:
+                self._chain_id = int(results[2], 16)
+        
+        except Exception as e:
+            logger.warning("Batch RPC request failed (%s), falling back to sequential calls", e)
+            latest = self.w3.eth.get_block("latest")
+            block_number = latest["number"]
+            # Only ask for the gas price on pre-London chains without a base fee
+            base_fee = latest.get("baseFeePerGas") or self.w3.eth.gas_price
+            nonce = self.w3.eth.get_transaction_count(self.account.address)
+            if self._chain_id is None:
+                self._chain_id = self.w3.eth.chain_id
+        
+        return block_number, base_fee, nonce, self._chain_id
+    
+    def _build_attack_calldata(self) -> Tuple[str, int]:
+        """
+        Load the attack targets and encode the executeAttack calldata.
+        
+        Returns:
+            Tuple of (0x-prefixed calldata, number of target contracts)
+        """
         # Load contract targets from CSV file
         try:
             import csv
-            import os
             
             # Get the directory of the current script
             script_dir = os.path.dirname(os.path.abspath(__file__))
             csv_path = os.path.join(script_dir, "big-contracts.csv")
             
-            # Default to 100 contracts if not specified
-            max_contracts = int(os.getenv('MAX_CONTRACTS', '100'))
+            max_contracts = self.max_contracts
             
             contract_targets = []
             with open(csv_path, 'r') as f:
@@ -961,52 +1699,67 @@ class ZKarnage:
                         break
                     contract_targets.append(Web3.to_checksum_address(row['address']))
             
-            logger.info(f"Loaded {len(contract_targets)} contracts from {csv_path}")
+            logger.info("Loaded %s contracts from %s", len(contract_targets), csv_path)
             
         except Exception as e:
-            logger.error(f"Error loading contracts from CSV: {e}")
+            logger.error("Error loading contracts from CSV: %s", e)
             logger.error("Falling back to hardcoded contract list")
             # Fallback to hardcoded list if CSV loading fails
-            contract_targets = [
-                Web3.to_checksum_address("0x1908D2bD020Ba25012eb41CF2e0eAd7abA1c48BC"),
-                # ... rest of the hardcoded addresses ...
-            ]
+            contract_targets = list(FALLBACK_CONTRACT_TARGETS)
         
         # Debug print addresses
-        logger.info(f"Contract targets: {contract_targets}")
-        logger.info(f"Number of targets: {len(contract_targets)}")
+        logger.debug("Contract targets: %s", contract_targets)
+        logger.info("Number of targets: %s", len(contract_targets))
         
         # Encode the function call data using eth-abi
         encoded_data = encode(['address[]'], [contract_targets])
         
         # Debug print encoded data
-        logger.info(f"Encoded data (hex): {encoded_data.hex()}")
+        encoded_hex = encoded_data.hex()
+        logger.debug("Encoded data (hex): %s", encoded_hex)
         
-        # Get function signature - ensure we get exactly 4 bytes
-        function_selector = Web3.keccak(text="executeAttack(address[])").hex()[0:10]  # 0x + 8 chars (4 bytes)
-        logger.info(f"Function selector: {function_selector}")
+        logger.info("Function selector: %s", EXECUTE_ATTACK_SELECTOR)
         
         # Full transaction data
-        data = function_selector + encoded_data.hex()
-        logger.info(f"Complete transaction data: {data[:64]}...")
+        data = EXECUTE_ATTACK_SELECTOR + encoded_hex
+        logger.info("Complete transaction data: %s...", data[:64])
         
-        # Set standard fees
-        max_priority_fee = Web3.to_wei(0.1, 'gwei')  # Standard priority fee
-        max_fee_per_gas = base_fee + Web3.to_wei(1, 'gwei')  # Base fee plus 1 gwei
+        return data, len(contract_targets)
+    
+    def _prepare_attack_transaction(
+        self, 
+        target_block: int, 
+        is_high_priority: bool, 
+        retry_count: int = 0,
+        context: Optional[Tuple[int, int, int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Prepare attack transaction.
+        
+        Args:
+            target_block: Block number to target
+            is_high_priority: Whether the account has high priority status (no longer used)
+            retry_count: Number of previous failed attempts, used to bump the priority fee
+            context: Result of _fetch_transaction_context to reuse; fetched when omitted
         
-        logger.info(f"Using standard fees - Max Fee: {Web3.from_wei(max_fee_per_gas, 'gwei')} gwei, " 
-                   f"Priority Fee: {Web3.from_wei(max_priority_fee, 'gwei')} gwei")
+        Returns:
+            Transaction dictionary
+        """
+        # Get base fee, nonce and chain id in one round-trip, unless the caller already has them
+        _, base_fee, nonce, chain_id = context or self._fetch_transaction_context()
         
-        # Calculate gas limit based on number of contracts
-        # Base cost of 86k gas for 12 contracts = ~7,167 gas per contract
-        gas_per_contract = 7167
-        num_contracts = len(contract_targets)
-        gas_limit = gas_per_contract * num_contracts
+        # Set standard fees
+        # Re-signed retries get a modestly higher tip so they stay competitive
+        fee_bump = min(retry_count * PRIORITY_FEE_BUMP, MAX_PRIORITY_FEE_BUMP)
+        max_priority_fee = MAX_PRIORITY_FEE + fee_bump
+        max_fee_per_gas = base_fee + BASE_FEE_BUFFER + fee_bump
         
-        # Add some buffer (20%) to account for variations
-        gas_limit = int(gas_limit * 1.2)
+        logger.info("Using standard fees - Max Fee: %s gwei, Priority Fee: %s gwei",
+                    Web3.from_wei(max_fee_per_gas, 'gwei'), Web3.from_wei(max_priority_fee, 'gwei'))
         
-        logger.info(f"Calculated gas limit: {gas_limit} (based on {num_contracts} contracts)")
+        # Gas limit only depends on the number of contracts, so it was computed with the calldata
+        gas_limit = self._attack_gas_limit
+        logger.info("Calculated gas limit: %s (based on %s contracts)", gas_limit, self._attack_target_count)
         
         # Create transaction dictionary with all required fields
         tx = {
@@ -1017,18 +1770,28 @@ class ZKarnage:
             'value': 0,  # Important to set explicitly
             'maxFeePerGas': max_fee_per_gas,
             'maxPriorityFeePerGas': max_priority_fee,
-            'nonce': self.w3.eth.get_transaction_count(self.account.address),
-            'data': data,
-            'chainId': self.w3.eth.chain_id,
+            'nonce': nonce,
+            'data': self._attack_data,
+            'chainId': chain_id,
         }
         
-        logger.info(f"Transaction prepared: {tx}")
+        logger.debug("Transaction prepared: %s", tx)
         return tx
 
 async def main():
     """Main execution function."""
-    # Load environment variables
-    load_dotenv()
+    # Load environment variables from .env; variables already set in the environment win
+    # (dotenv is only needed here, so import it lazily)
+    from dotenv import load_dotenv
+    load_dotenv(override=False)
+    
+    # Apply LOG_LEVEL now that .env is loaded; unknown names keep the INFO default
+    log_level_name = os.getenv("LOG_LEVEL", "INFO").upper()
+    log_level = logging.getLevelName(log_level_name)
+    if isinstance(log_level, int):
+        logging.getLogger().setLevel(log_level)
+    else:
+        logger.warning("Unknown LOG_LEVEL %r, using INFO", log_level_name)
     
     # Check for flags
     fast_mode = "--fast" in sys.argv
@@ -1046,17 +1809,23 @@ async def main():
     PRIVATE_KEY = os.getenv('PRIVATE_KEY')
     FLASHBOTS_RELAY_URL = os.getenv('FLASHBOTS_RELAY_URL', 'https://relay.flashbots.net')
     CONTRACT_ADDRESS = os.getenv('ZKARNAGE_CONTRACT_ADDRESS', "0x55A942D18C0C57975e834Ee3afc8DEe01b674C43")
+    ETH_WS_URL = os.getenv('ETH_WS_URL')
+    # Default to 100 contracts if not specified
+    MAX_CONTRACTS = int(os.getenv('MAX_CONTRACTS', '100'))
     
     # Log the contract address being used
-    logger.info(f"Using ZKarnage contract address: {CONTRACT_ADDRESS}")
+    logger.info("Using ZKarnage contract address: %s", CONTRACT_ADDRESS)
     
     # Validate required variables
     if not all([ETH_RPC_URL, PRIVATE_KEY, CONTRACT_ADDRESS]):
         logger.error("Missing required environment variables")
         return 1
     
-    # Initialize Web3
-    w3 = Web3(HTTPProvider(ETH_RPC_URL))
+    # Initialize Web3 over a pooled keep-alive session. requests sessions are not
+    # thread-safe, so web3 only uses it on this thread and keeps a separate session
+    # for each worker thread. ETH_WS_URL is only used for the newHeads subscription
+    session = create_rpc_session()
+    w3 = Web3(HTTPProvider(ETH_RPC_URL, session=session, request_kwargs={"timeout": RPC_TIMEOUT}))
     
     # Validate connection
     if not w3.is_connected():
@@ -1071,46 +1840,97 @@ async def main():
         w3=w3, 
         account=account, 
         relay_url=FLASHBOTS_RELAY_URL,
-        contract_address=Web3.to_checksum_address(CONTRACT_ADDRESS)
+        contract_address=Web3.to_checksum_address(CONTRACT_ADDRESS),
+        session=session,
+        ws_url=ETH_WS_URL,
+        rpc_url=ETH_RPC_URL,
+        max_contracts=MAX_CONTRACTS
     )
     
-    # For fast mode, just run once
-    if fast_mode:
-        logger.info("Fast mode: Running single attack attempt")
-        success = await zkarnage.execute_attack(target_hundred=True, fast_mode=True, flashbots_mode=flashbots_mode)
-        return 0 if success else 1
-    
-    # For hundred-block mode, keep trying until success
-    logger.info("Continuous mode: Will keep trying until a successful attack")
-    attempt_number = 1
-    
-    while True:
-        logger.info(f"=== Starting attack attempt #{attempt_number} ===")
-        
-        # Get current block to estimate time until next hundred-block
-        current_block = w3.eth.block_number
-        next_hundred = zkarnage.get_next_hundred_block(current_block)
-        blocks_to_wait = next_hundred - current_block
-        
-        logger.info(f"Current block: {current_block}")
-        logger.info(f"Next target block: {next_hundred} ({blocks_to_wait} blocks away)")
+    try:
+        # Validate contract deployment, fetching the block number alongside
+        try:
+            current_block = zkarnage.check_contract_deployed()
+        except Exception as e:
+            logger.error("Failed to check contract deployment: %s", e)
+            return 1
         
-        # Run the attack
-        success = await zkarnage.execute_attack(target_hundred=True, fast_mode=False, flashbots_mode=flashbots_mode)
+        # A bad ETH_WS_URL would otherwise only surface on the first wait for a block
+        if ETH_WS_URL:
+            try:
+                await zkarnage.check_ws_endpoint()
+            except ZKarnageError as e:
+                logger.error("%s (unset ETH_WS_URL to poll over HTTP instead)", e)
+                return 1
         
-        if success:
-            logger.info(f"Attack succeeded on attempt #{attempt_number}!")
-            return 0
+        # For fast mode, just run once
+        if fast_mode:
+            logger.info("Fast mode: Running single attack attempt")
+            success = await zkarnage.execute_attack(
+                target_hundred=True, 
+                fast_mode=True, 
+                flashbots_mode=flashbots_mode,
+                current_block=current_block
+            )
+            return 0 if success else 1
         
-        logger.warning(f"Attack attempt #{attempt_number} failed. Preparing for next attempt...")
-        attempt_number += 1
+        # For hundred-block mode, keep trying until success
+        logger.info("Continuous mode: Will keep trying until a successful attack")
+        attempt_number = 1
+        same_target_failures = 0
+        # Only missed targets bump the priority fee; same-target retries reuse it
+        missed_targets = 0
         
-        # Wait a bit before trying again to avoid hammering the API
-        # Calculate approximately how long until the next hundred-block
-        # Assuming ~12 second block times 
-        estimated_wait = (blocks_to_wait-4) * 12 / 2 
-        logger.info(f"Waiting {estimated_wait:.0f} seconds before next attempt...")
-        await asyncio.sleep(estimated_wait)
+        while True:
+            logger.info("=== Starting attack attempt #%s ===", attempt_number)
+            
+            next_hundred = zkarnage.get_next_hundred_block(current_block)
+            blocks_to_wait = next_hundred - current_block
+            
+            logger.info("Current block: %s", current_block)
+            logger.info("Next target block: %s (%s blocks away)", next_hundred, blocks_to_wait)
+            
+            # Run the attack
+            success = await zkarnage.execute_attack(
+                target_hundred=True, 
+                fast_mode=False, 
+                flashbots_mode=flashbots_mode,
+                retry_count=missed_targets,
+                current_block=current_block
+            )
+            
+            if success:
+                logger.info("Attack succeeded on attempt #%s!", attempt_number)
+                return 0
+            
+            logger.warning("Attack attempt #%s failed. Preparing for next attempt...", attempt_number)
+            attempt_number += 1
+            
+            attempted_target = next_hundred
+            current_block = await zkarnage._get_block_number()
+            next_hundred = zkarnage.get_next_hundred_block(current_block)
+            
+            if next_hundred == attempted_target:
+                # Failed before the target passed (e.g. simulation errors); back off so a
+                # persistent failure does not hammer the relay. The delay is capped by the
+                # time left before the target, but never drops below one poll interval
+                same_target_failures += 1
+                remaining = (next_hundred - current_block - 1) * SLOT_TIME
+                delay = min(RETRY_BACKOFF_BASE * 2 ** min(same_target_failures, 6), max(remaining, BLOCK_POLL_INTERVAL))
+                delay *= 0.75 + random.random() * 0.5
+                logger.info("Retrying block %s in %.1f seconds...", next_hundred, delay)
+                await asyncio.sleep(delay)
+                current_block = await zkarnage._get_block_number()
+            else:
+                # Sleep until shortly before the next hundred-block instead of a fixed guess,
+                # so the next attempt prepares its transaction with fresh fee and nonce state
+                same_target_failures = 0
+                missed_targets += 1
+                logger.info("Waiting for block %s before next attempt...", next_hundred - PREPARE_LEAD_BLOCKS)
+                current_block = await zkarnage.wait_for_block(next_hundred - PREPARE_LEAD_BLOCKS)
+    finally:
+        # Release the pooled relay connections
+        await zkarnage.close()
 
 if __name__ == "__main__":
     sys.exit(asyncio.run(main()))
\ No newline at end of file